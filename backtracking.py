@@ -0,0 +1,184 @@
+# backtracking.py
+
+import time
+from functools import lru_cache
+from typing import List, Tuple, Dict
+from tqdm import tqdm
+
+from config import (
+    WORDS_PER_PUZZLE,
+    PUZZLE_ROWS, PUZZLE_COLUMNS,
+    DIRECTIONS, VERBOSE, BACKTRACK_MAX_NODES, BACKTRACK_NODES_PER_WORD
+)
+from geometry import indexed_segments
+from deadline import expired
+import metrics
+
+Location = Tuple[Tuple[int, int], Tuple[int, int]]
+
+
+@lru_cache(maxsize=32)
+def _cell_positions(rows: int, cols: int, L: int) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+    """Celda -> [(segmento, posición de la celda dentro del segmento)] para longitud L."""
+    segs, _, _ = indexed_segments(rows, cols, L)
+    positions: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    for sid, (*_, cells) in enumerate(segs):
+        for j, cell in enumerate(cells):
+            positions.setdefault(cell, []).append((sid, j))
+    return positions
+
+
+def _solve(
+    words: List[str], target: int, rows: int, cols: int, max_nodes: int,
+    deadline: float | None = None
+) -> Tuple[Dict[str, Location], bool, bool]:
+    """Búsqueda con vuelta atrás para colocar `target` de las palabras dadas.
+    Palabra más restringida primero y comprobación hacia delante: el dominio de
+    cada palabra pendiente son los segmentos donde aún cabe. Una palabra sin
+    dominio se descarta mientras queden bastantes para llegar a `target`; si no,
+    se poda. Así las palabras sobrantes sustituyen a las que no caben.
+    Devuelve (mejores ubicaciones, objetivo alcanzado, búsqueda agotada)."""
+    n = len(words)
+    puzzle = [['' for _ in range(cols)] for _ in range(rows)]
+    segs = {L: indexed_segments(rows, cols, L)[0] for L in {len(w) for w in words}}
+    positions = {L: _cell_positions(rows, cols, L) for L in segs}
+    domains = [set(range(len(segs[len(w)]))) for w in words]
+    assigned: Dict[int, int] = {}
+    open_words = {k for k in range(n) if domains[k]}  # ni colocadas ni descartadas
+    dir_counts = {d: 0 for d in DIRECTIONS}
+    best: Dict[str, Location] = {}
+    nodes = 0
+    aborted = False
+
+    def locations() -> Dict[str, Location]:
+        locs = {}
+        for i, sid in assigned.items():
+            _, _, r0, c0, cells = segs[len(words[i])][sid]
+            locs[words[i]] = ((r0, c0), cells[-1])
+        return locs
+
+    def search(greedy: bool = False) -> bool:
+        nonlocal best, nodes, aborted
+        if len(assigned) > len(best):
+            best = locations()
+        if len(assigned) >= target:
+            return True
+        if nodes >= max_nodes or expired(deadline):
+            aborted = True
+            return False
+        if not open_words:
+            return False
+        if not greedy and len(assigned) + len(open_words) < target:
+            # Rama sin solución: se completa con la primera opción de cada palabra
+            # solo para mejorar la colocación parcial que se devuelve si no hay éxito
+            search(greedy=True)
+            return False
+
+        # Palabra más restringida (a igualdad, la más larga y la primera)
+        i = min(open_words, key=lambda k: (len(domains[k]), -len(words[k]), k))
+        word = words[i]
+        table = segs[len(word)]
+        open_words.discard(i)
+
+        # Primero más cruces, luego dirección menos usada
+        values = []
+        for sid in domains[i]:
+            df, dc, _, _, cells = table[sid]
+            match = sum(1 for (r, c), ch in zip(cells, word) if puzzle[r][c] == ch)
+            values.append((-match, dir_counts[(df, dc)], sid))
+        values.sort()
+
+        for _, _, sid in (values[:1] if greedy else values):
+            nodes += 1
+            df, dc, _, _, cells = table[sid]
+            new_cells = [((r, c), ch) for (r, c), ch in zip(cells, word) if puzzle[r][c] == '']
+            for (r, c), ch in new_cells:
+                puzzle[r][c] = ch
+
+            # Comprobación hacia delante: solo segmentos que pasan por celdas nuevas
+            removed: List[Tuple[int, int]] = []
+            dropped: List[int] = []
+            for k in list(open_words):
+                other, dom = words[k], domains[k]
+                pos = positions[len(other)]
+                for cell, ch in new_cells:
+                    for s, j in pos.get(cell, ()):
+                        if other[j] != ch and s in dom:
+                            dom.discard(s)
+                            removed.append((k, s))
+                if not dom:
+                    open_words.discard(k)
+                    dropped.append(k)
+
+            assigned[i] = sid
+            dir_counts[(df, dc)] += 1
+            if search(greedy):
+                return True
+            dir_counts[(df, dc)] -= 1
+            del assigned[i]
+
+            open_words.update(dropped)
+            for k, s in removed:
+                domains[k].add(s)
+            for (r, c), _ in new_cells:
+                puzzle[r][c] = ''
+            if aborted:
+                break
+
+        # Ninguna posición sirve: probar sin esta palabra si sobran candidatas
+        if not greedy and not aborted and search():
+            return True
+        open_words.add(i)
+        return False
+
+    solved = search()
+    if metrics.ENABLED:
+        metrics.count("backtrack_nodes", nodes)
+    return best, solved, not aborted
+
+
+def backtracking_word_search(
+    words: List[str],
+    rows: int = PUZZLE_ROWS,
+    cols: int = PUZZLE_COLUMNS,
+    max_nodes: int | None = BACKTRACK_MAX_NODES,
+    deadline: float | None = None
+) -> Tuple[List[List[str]], List[str], Dict[str, Location], str]:
+    """
+    Intenta colocar exactamente min(WORDS_PER_PUZZLE, len(words)) palabras con
+    un resolutor de vuelta atrás acotado a `max_nodes` nodos (None =
+    BACKTRACK_NODES_PER_WORD por palabra) y a `deadline`.
+    Las palabras que sobran sirven de repuesto para las que no caben; a igualdad
+    se prefieren las primeras.
+    Devuelve: (tablero sin rellenar, lista_de_palabras_colocadas, ubicaciones, estado);
+    si no se consigue, la mejor colocación parcial encontrada. El estado es
+    "solved", "infeasible" (búsqueda agotada: la selección no cabe), "node_limit"
+    o "timeout"; en los tres últimos el llamador debe completar o cambiar las palabras.
+    """
+    start_all = time.perf_counter()
+
+    originals: Dict[str, str] = {}
+    for w in words:
+        originals.setdefault(w.upper(), w)
+    candidates = list(originals)
+    target = min(WORDS_PER_PUZZLE, len(candidates))
+    if max_nodes is None:
+        max_nodes = BACKTRACK_NODES_PER_WORD * len(candidates)
+
+    best, solved, exhausted = _solve(candidates, target, rows, cols, max_nodes, deadline)
+
+    puzzle = [['' for _ in range(cols)] for _ in range(rows)]
+    for p, ((r0, c0), (rf, cf)) in best.items():
+        df, dc = (rf > r0) - (rf < r0), (cf > c0) - (cf < c0)
+        for k, ch in enumerate(p):
+            puzzle[r0 + df*k][c0 + dc*k] = ch
+
+    status = ("solved" if solved else "infeasible" if exhausted else
+              "timeout" if expired(deadline) else "node_limit")
+    if metrics.ENABLED and not solved:
+        metrics.count(f"backtrack_{status}")
+    if VERBOSE:
+        tqdm.write(f"[BACKTRACK] Colocadas {len(best)}/{target} palabras ({status}) "
+                   f"en {time.perf_counter() - start_all:.2f}s.")
+
+    return puzzle, [originals[p] for p in best], best, status
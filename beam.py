@@ -0,0 +1,119 @@
+# beam.py
+
+import time
+from typing import List, Tuple, Dict
+
+import numpy as np
+from tqdm import tqdm
+
+from config import (
+    WORDS_PER_PUZZLE,
+    PUZZLE_ROWS, PUZZLE_COLUMNS,
+    DIRECTIONS, VERBOSE, BEAM_WIDTH, BEAM_BRANCHING
+)
+from deadline import expired
+import metrics
+from geometry import segment_arrays, EMPTY
+from word_placement import fill_empty_spaces
+
+Location = Tuple[Tuple[int, int], Tuple[int, int]]
+# (tablero, usos por dirección, cruces, palabras colocadas, historial enlazado)
+State = Tuple[bytearray, Tuple[int, ...], int, int, tuple | None]
+
+
+def _rank(state: State) -> tuple:
+    """Más palabras, más cruces, más celdas libres y direcciones más equilibradas."""
+    board, counts, crossings, placed, _ = state
+    return placed, crossings, board.count(EMPTY), min(counts) - max(counts)
+
+
+def beam_word_search(
+    words: List[str],
+    rows: int = PUZZLE_ROWS,
+    cols: int = PUZZLE_COLUMNS,
+    width: int = BEAM_WIDTH,
+    branching: int = BEAM_BRANCHING,
+    deadline: float | None = None
+) -> Tuple[List[List[str]], List[str], Dict[str, Location]]:
+    """
+    Variante de greedy_word_search con búsqueda en haz: en vez de comprometerse
+    con una posición por palabra, mantiene los `width` mejores tableros parciales
+    (más palabras, más cruces, más celdas libres) y expande cada uno con sus
+    `branching` mejores posiciones para la palabra siguiente.
+    Cada tablero es un bytearray de rows×cols que solo se copia al expandirlo,
+    así que la memoria queda acotada a unos width×branching tableros.
+    Si vence `deadline` (time.perf_counter), devuelve el mejor tablero hasta ese momento.
+    Devuelve: (tablero, lista_de_palabras_colocadas, ubicaciones)
+    """
+    start_all = time.perf_counter()
+
+    originals: Dict[str, str] = {}
+    for w in words:
+        originals.setdefault(w.upper(), w)
+    target = min(WORDS_PER_PUZZLE, len(originals))
+
+    beam: List[State] = [(bytearray(rows*cols), (0,) * len(DIRECTIONS), 0, 0, None)]
+
+    if VERBOSE:
+       tqdm.write(f"\n[BEAM] Generando sopa ({rows}×{cols}), {len(originals)} candidatas, "
+              f"haz de {width}×{branching}, colocando {target}...\n")
+
+    for p in originals:
+        if beam[0][3] >= target or expired(deadline):
+            break
+
+        letters = np.frombuffer(p.encode('latin-1'), dtype=np.uint8)
+        cells, dir_idx, r0s, c0s = segment_arrays(rows, cols, len(p))
+        if metrics.ENABLED:
+            metrics.count("candidates_scanned", len(cells) * len(beam))
+
+        children: List[State] = []
+        for state in beam:
+            board, counts, crossings, placed, history = state
+            current = np.frombuffer(board, dtype=np.uint8)[cells]
+            same = current == letters
+            ok = np.flatnonzero((same | (current == EMPTY)).all(axis=1))
+            if placed >= target or ok.size == 0:
+                children.append(state)  # la palabra no cabe: el tablero sigue igual
+                continue
+
+            # Las `branching` mejores: más cruces, dirección menos usada, orden de recorrido
+            match = same[ok].sum(axis=1)
+            usage = np.asarray(counts)[dir_idx[ok]]
+            for i in ok[np.lexsort((ok, usage, -match))[:branching]]:
+                child = bytearray(board)
+                np.frombuffer(child, dtype=np.uint8)[cells[i]] = letters
+                k = int(dir_idx[i])
+                child_counts = counts[:k] + (counts[k] + 1,) + counts[k+1:]
+                move = (p, int(r0s[i]), int(c0s[i]), k)
+                children.append((child, child_counts, crossings + int(same[i].sum()), placed + 1, (move, history)))
+
+        # Los `width` mejores tableros distintos
+        children.sort(key=_rank, reverse=True)
+        beam, seen = [], set()
+        for child in children:
+            key = bytes(child[0])
+            if key not in seen:
+                seen.add(key)
+                beam.append(child)
+                if len(beam) >= width:
+                    break
+
+    # Mejor tablero: ubicaciones a partir del historial
+    board, counts, crossings, placed, history = beam[0]
+    locations: Dict[str, Location] = {}
+    while history is not None:
+        (p, r0, c0, k), history = history
+        df, dc = DIRECTIONS[k]
+        locations[p] = ((r0, c0), (r0 + df*(len(p)-1), c0 + dc*(len(p)-1)))
+    locations = dict(reversed(locations.items()))
+
+    puzzle = [[chr(v) if v != EMPTY else '' for v in board[i*cols:(i+1)*cols]] for i in range(rows)]
+    fill_empty_spaces(puzzle, rows, cols)
+
+    if VERBOSE:
+        total_time = time.perf_counter() - start_all
+        tqdm.write(f"\n[BEAM] Colocadas {placed}/{target} palabras con {crossings} cruces "
+                   f"en {total_time:.2f}s.")
+
+    return puzzle, [originals[p] for p in locations], locations
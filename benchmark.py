@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+benchmark.py: Reproducible benchmark of the placement engines and the export path.
+
+Uses the fixed word sample in benchmark_words.txt and fixed seeds, so it needs
+neither spaCy nor the word source. Results are saved as JSON; --compare flags
+regressions against a stored baseline.
+
+    python benchmark.py                          # run, write benchmark_results.json
+    python benchmark.py --quick --no-export      # smaller run, engines only
+    python benchmark.py --compare baseline.json  # run and compare (exit 1 on regressions)
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import config
+import lookfor
+import greedy
+import beam
+import backtracking
+import lookfor_vectorized
+import local_search
+from config import DIRECTIONS, WORDS_PER_PUZZLE
+from placement_utils import try_random_placement
+from word_placement import fill_empty_spaces
+
+WORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_words.txt")
+SEED = 20240101
+
+# (name, rows, columns, words per selection, puzzles)
+SCENARIOS = [
+    ("14x17-50", 14, 17, 50, 10),
+    ("14x17-30", 14, 17, 30, 10),
+    ("25x25-50", 25, 25, 50, 4),
+    ("50x50-50", 50, 50, 50, 2),
+]
+ENGINES = ["lookfor", "greedy", "topup"]
+OPTIONAL_ENGINES = ["lookfor_np", "beam", "backtracking"]
+
+# metric -> True if higher is better
+METRICS = {
+    "puzzles_per_sec": True,
+    "success_rate": True,
+    "latency_p50_ms": False,
+    "latency_p90_ms": False,
+    "latency_p99_ms": False,
+    "sec_per_puzzle": False,
+    "sec": False,
+}
+
+
+def load_words() -> list[str]:
+    with open(WORDS_FILE, encoding="utf-8") as f:
+        return [w.strip() for w in f if w.strip()]
+
+
+@contextmanager
+def timed_placements(module, stamps: list[float]):
+    """Record a timestamp every time `module` places a word."""
+    original = module.place_word
+
+    def place_word(*args, **kwargs):
+        result = original(*args, **kwargs)
+        stamps.append(time.perf_counter())
+        return result
+
+    module.place_word = place_word
+    try:
+        yield
+    finally:
+        module.place_word = original
+
+
+def run_engine(engine: str, words: list[str], rows: int, columns: int) -> tuple[dict, list[float]]:
+    """Place `words` with `engine`. Returns (locations, per-word latencies in seconds)."""
+    words = sorted(words, key=lambda w: -len(w))
+    stamps = [time.perf_counter()]
+
+    if engine == "lookfor":
+        with timed_placements(lookfor, stamps):
+            _, _, locations = lookfor.lookfor_sequential_word_search(words, rows, columns)
+    elif engine == "greedy":
+        with timed_placements(greedy, stamps):
+            _, locations = greedy.greedy_word_search(words, rows, columns)
+    elif engine == "topup":
+        # the try_random_placement path on its own, one word at a time
+        puzzle = [['' for _ in range(columns)] for _ in range(rows)]
+        locations, dir_counts = {}, {d: 0 for d in DIRECTIONS}
+        for w in words:
+            if len(locations) >= WORDS_PER_PUZZLE:
+                break
+            if try_random_placement(w, puzzle, rows, columns, locations, dir_counts):
+                stamps.append(time.perf_counter())
+    elif engine == "lookfor_np":
+        _, _, locations = lookfor_vectorized.lookfor_vectorized_word_search(words, rows, columns)
+    elif engine == "beam":
+        _, _, locations = beam.beam_word_search(words, rows, columns)
+    elif engine == "backtracking":
+        _, _, locations, _ = backtracking.backtracking_word_search(words, rows, columns)
+    else:
+        raise ValueError(f"Unknown engine: {engine}")
+
+    if len(stamps) == 1:  # engines without a place_word hook: average per placed word
+        per_word = (time.perf_counter() - stamps[0]) / max(1, len(locations))
+        return locations, [per_word] * len(locations)
+    return locations, [b - a for a, b in zip(stamps, stamps[1:])]
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def bench_engines(words: list[str], scenarios: list, engines: list[str]) -> tuple[dict, dict]:
+    """Returns (results, puzzles of the first scenario for the export benchmark)."""
+    results, sample = {}, {}
+    for name, rows, columns, size, count in scenarios:
+        rng = random.Random(f"{SEED}-{name}")
+        jobs = [(rng.sample(words, size), rng.getrandbits(64)) for _ in range(count)]
+        target = min(WORDS_PER_PUZZLE, size)
+
+        for engine in engines:
+            latencies, placed, complete = [], [], 0
+            start = time.perf_counter()
+            for selection, seed in jobs:
+                random.seed(seed)
+                locations, lat = run_engine(engine, selection, rows, columns)
+                latencies.extend(lat)
+                placed.append(len(locations))
+                complete += len(locations) >= target
+            elapsed = time.perf_counter() - start
+
+            results[f"{name}/{engine}"] = {
+                "puzzles_per_sec": count / elapsed,
+                "success_rate": sum(placed) / (target * count),
+                "complete_rate": complete / count,
+                "latency_p50_ms": percentile(latencies, 0.50) * 1000,
+                "latency_p90_ms": percentile(latencies, 0.90) * 1000,
+                "latency_p99_ms": percentile(latencies, 0.99) * 1000,
+            }
+            print(f"  {name:9} {engine:12} {count / elapsed:8.2f} puzzles/s  "
+                  f"success {100 * sum(placed) / (target * count):5.1f}%  "
+                  f"p50 {results[f'{name}/{engine}']['latency_p50_ms']:.3f} ms  "
+                  f"p99 {results[f'{name}/{engine}']['latency_p99_ms']:.3f} ms")
+
+        # fill_empty_spaces on an empty board of this shape
+        start = time.perf_counter()
+        for _ in range(count):
+            fill_empty_spaces([['' for _ in range(columns)] for _ in range(rows)], rows, columns)
+        results[f"{name}/fill"] = {"sec_per_puzzle": (time.perf_counter() - start) / count}
+
+        if not sample:
+            random.seed(SEED)
+            sample = {"rows": rows, "columns": columns, "puzzles": []}
+            for selection, seed in jobs:
+                random.seed(seed)
+                puzzle, placed_words, locations = lookfor.lookfor_sequential_word_search(
+                    sorted(selection, key=lambda w: -len(w)), rows, columns)
+                sample["puzzles"].append((puzzle, placed_words, locations))
+    return results, sample
+
+
+def bench_export(sample: dict) -> dict:
+    """Time the puzzle and solution images (config.RENDERER) and a small book through create_docx."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import export_docx
+
+    puzzles = sample["puzzles"]
+    start = time.perf_counter()
+    for n, (puzzle, _, locations) in enumerate(puzzles, start=1):
+        export_docx.puzzle_image(puzzle)
+        export_docx.solution_image(puzzle, locations, n)
+    render = (time.perf_counter() - start) / len(puzzles)
+    print(f"  render    {render * 1000:8.1f} ms/puzzle ({config.RENDERER}, puzzle + solution)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        export_docx.create_docx(puzzles, name=os.path.join(tmp, "benchmark.docx"))
+        export = time.perf_counter() - start
+    print(f"  export    {export:8.2f} s for {len(puzzles)} puzzles")
+    return {"render": {"sec_per_puzzle": render},
+            "export": {"sec": export, "puzzles": len(puzzles)}}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Metrics worse than the baseline by more than `tolerance` (relative)."""
+    regressions = []
+    for key, base in baseline.items():
+        for metric, higher_is_better in METRICS.items():
+            if metric not in base or metric not in results.get(key, {}):
+                continue
+            old, new = base[metric], results[key][metric]
+            if old == 0:
+                continue
+            change = (new - old) / old
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(f"{key} {metric}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help=f"comma-separated, from {ENGINES + OPTIONAL_ENGINES}")
+    parser.add_argument("--quick", action="store_true", help="one size, fewer puzzles")
+    parser.add_argument("--no-export", action="store_true", help="skip rendering and create_docx")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against this JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="relative slack before flagging")
+    args = parser.parse_args()
+
+    # engine logging would dominate the timings
+    for module in (config, lookfor, greedy, beam, backtracking, lookfor_vectorized, local_search):
+        module.VERBOSE = False
+
+    scenarios = [SCENARIOS[0][:4] + (3,)] if args.quick else SCENARIOS
+    words = load_words()
+    print(f"Benchmark: {len(words)} words, seed {SEED}")
+    results, sample = bench_engines(words, scenarios, args.engines.split(","))
+    if not args.no_export:
+        results.update(bench_export(sample))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": SEED,
+            "quick": args.quick,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to '{args.out}'.")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"{len(regressions)} regression(s) against '{args.compare}'.")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,18 @@
 # check_words.py
 
-import os
 import random
-import pickle
+from tqdm import tqdm
 
-from config import USE_LOOKFOR, WORDS_PER_PUZZLE, PUZZLE_ROWS, PUZZLE_COLUMNS
-from generator import generate_word_search, build_filtered_dict
-from data_loader import get_raw_words, load_blacklist
+from config import USE_LOOKFOR, WORDS_PER_PUZZLE, PUZZLE_ROWS, PUZZLE_COLUMNS, PUZZLE_STORE
+from generator import generate_word_search, load_filtered_dict
+from data_loader import load_blacklist
+from puzzle_store import PuzzleStore
 
 print("🔍 Generando sopas de letras para verificar…\n")
 
 # 1) Cargar y filtrar palabras
-raw = get_raw_words()
-print(f"Cargadas {len(raw)} palabras en bruto.")
 blacklist = load_blacklist()
-filtered = build_filtered_dict(raw, blacklist)
+filtered = load_filtered_dict(blacklist)
 print(f"Filtradas a {len(filtered)} palabras.\n")
 
 # 2) Probar N puzzles
@@ -36,20 +34,18 @@ for i in range(1, num_puzzles + 1):
 
     tqdm.write(f"   Puzzle {i}: {len(placed_words)} palabras de {WORDS_PER_PUZZLE}")
 
-# 3) (Opcional) Si no hay puzzles en memoria y deseas cargar un .pkl
-if num_puzzles == 0:
-    tqdm.write("\nNo se generaron puzzles en memoria. Buscando .docx.pkl…")
-    for fn in os.listdir('.'):
-        if fn.endswith('.docx.pkl'):
-            tqdm.write(f"🔄 Analizando archivo: {fn}")
-            with open(fn, 'rb') as f:
-                try:
-                    puzzles = pickle.load(f)
-                except Exception as e:
-                    tqdm.write(f"❌ Error al cargar {fn}: {e}")
-                    break
-
-            tqdm.write(f"   • Palabras esperadas por puzzle: {WORDS_PER_PUZZLE}")
-            for idx, (puz, words, locs) in enumerate(puzzles, 1):
-                tqdm.write(f"   Puzzle {idx}: {len(locs)} palabras de {len(words)}")
-            break
+# 3) Verificar los puzzles que main.py ha ido guardando (puzzle_store), sin regenerarlos
+store = PuzzleStore(PUZZLE_STORE) if PUZZLE_STORE else None
+if store is not None and store.load():
+    tqdm.write(f"\n🔄 Analizando almacén: {store.data_path} ({len(store)} puzzles)")
+    tqdm.write(f"   • Palabras esperadas por puzzle: {WORDS_PER_PUZZLE}")
+    for idx, (puz, words, locs) in enumerate(store, 1):
+        # cada ubicación debe deletrear su palabra en el tablero
+        wrong = []
+        for w, ((r0, c0), (rf, cf)) in locs.items():
+            dr, dc = (rf > r0) - (rf < r0), (cf > c0) - (cf < c0)
+            if ''.join(puz[r0 + dr*k][c0 + dc*k] for k in range(len(w))) != w:
+                wrong.append(w)
+        note = f" ❌ mal ubicadas: {', '.join(wrong)}" if wrong else ""
+        tqdm.write(f"   Puzzle {idx}: {len(locs)} palabras de {WORDS_PER_PUZZLE}{note}")
+    store.close()
@@ -1,13 +1,16 @@
 # config.py
 
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.enum.table import WD_TABLE_ALIGNMENT
-
 # ——— GENERAL CONFIGURATION ———
 VERBOSE           = True
 
 TITLE_DOCX         = "Sopa de Letras"
 USE_LOOKFOR        = True
+LOOKFOR_INCREMENTAL = True   # lookfor actualiza solo los segmentos afectados por cada palabra
+USE_VECTORIZED     = False  # con USE_LOOKFOR, usa el motor NumPy (lookfor_vectorized.py)
+USE_BACKTRACKING   = False  # resolutor exacto con vuelta atrás (backtracking.py)
+BACKTRACK_MAX_NODES   = None   # nodos por intento; None = BACKTRACK_NODES_PER_WORD por palabra de la selección
+BACKTRACK_NODES_PER_WORD = 100  # con 60 palabras, 6000 nodos; 10 veces más apenas añade una o dos palabras
+BACKTRACK_SPARE_WORDS = 10     # palabras de repuesto por puzzle para el resolutor
 WORD_SOURCE        = "file" #on "wordfreq"
 WORD_SOURCE_FILE   = "palabras_todas.txt"
 MAX_RAW_WORDS      = 1000000
@@ -16,6 +19,13 @@ MIN_WORD_LENGTH    = 4
 MAX_WORD_LENGTH    = 10
 POS_ALLOWED        = {"NOUN", "VERB", "ADV"}
 BLACKLIST_FILE     = "blacklist.json"
+SPACY_MODEL        = "es_core_news_lg"
+POS_WORKERS        = 1       # >1 etiqueta en paralelo con un pool de procesos
+POS_CHUNK_SIZE     = 20000   # palabras por bloque enviado a cada proceso
+
+# ——— Caché del diccionario filtrado ———
+USE_DICT_CACHE     = True
+DICT_CACHE_DIR     = ".cache"
 
 # ——— Proporciones para lookfor_sequential_word_search ———
 LONG_RATIO    = 0.30   # 30% de WORDS_PER_PUZZLE serán “largas”
@@ -25,11 +35,27 @@ SHORT_RATIO   = 0.30   # 30% “cortas”
 WORDS_PER_PUZZLE   = 50  # Mantenemos 50 palabras como objetivo
 PUZZLE_ROWS        = 14  # Mantenemos las dimensiones actuales
 PUZZLE_COLUMNS     = 17  # Mantenemos las dimensiones actuales
-MAX_FALLBACK_TRIES = 20000  # Aumentado significativamente para garantizar la colocación de 50 palabras
 ALPHABET           = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 DIRECTIONS         = [(0,1),(1,0),(0,-1),(-1,0),(1,1),(1,-1),(-1,1),(-1,-1)]
+GEOMETRY_CACHE_SIZE = 64  # tablas de segmentos (filas, columnas, longitud) en memoria
 
 TOTAL_PUZZLES      = 365
+GENERATION_WORKERS = 1     # procesos para generar puzzles (1 = en este proceso)
+GENERATION_SEED    = None  # semilla del libro; None = aleatoria (se muestra al empezar)
+PUZZLE_TIME_BUDGET = None  # segundos por puzzle; al vencer se devuelve lo colocado y el puzzle deja de ser reproducible (None = sin límite)
+PUZZLE_RETRIES     = 2     # reintentos con otra selección de palabras si un puzzle se queda corto por tiempo o porque sus palabras no caben
+PUZZLE_STORE       = "puzzle_store"  # base de puzzle_store.bin/.idx, donde se guarda cada puzzle terminado (None = no guardar)
+PUZZLE_STORE_RESUME = True  # continuar una ejecución interrumpida (misma configuración) desde el último puzzle guardado
+PUZZLE_STORE_REUSE  = False  # aprovechar un almacén ya completo en vez de generar el libro de nuevo
+PORTFOLIO_ATTEMPTS = 1     # intentos por puzzle (lookfor, greedy y variantes); se queda el mejor según evaluation.py
+PORTFOLIO_TARGET_SCORE = None  # puntuación con la que se deja de lanzar intentos (None = hacerlos todos)
+USE_BEAM           = False  # motor de búsqueda en haz (beam.py) en lugar de lookfor/greedy
+BEAM_WIDTH         = 16     # tableros parciales que se conservan por palabra
+BEAM_BRANCHING     = 4      # posiciones que se prueban por tablero y palabra
+USE_LOCAL_SEARCH   = False  # mejora cada puzzle con búsqueda local (local_search.py) tras el motor elegido
+LOCAL_SEARCH_ITERATIONS = 3000  # movimientos máximos por puzzle
+LOCAL_SEARCH_TIME_BUDGET = None  # segundos máximos por puzzle (None = solo el límite de movimientos)
+LOCAL_SEARCH_HISTORY = 50  # longitud de la memoria de aceptación tardía
 
 # PDF settings
 PDF_PAGE_SIZE      = (8.27, 11.69)
@@ -39,14 +65,28 @@ PDF_TITLE_FONT     = dict(size=14, weight='bold')
 PDF_PUZZLE_FONT    = 14
 PDF_SOLUTION_FONT  = 12
 PDF_WORDLIST_FONT  = 10
+PDF_FONT_FILES     = {"normal": "DejaVuSans.ttf", "bold": "DejaVuSans-Bold.ttf"}  # se buscan también entre las de matplotlib
+PDF_WRITER         = "native"  # "native" (export_pdf.py, PDF vectorial) o "docx2pdf" (convierte el DOCX con Word/LibreOffice)
 
 # DOCX settings
 SOLUTION_PER_PAGE  = 15
 SOLUTION_COLS      = 3
+SOLUTION_SHEETS    = False  # cada página de soluciones como una sola imagen compuesta (en vez de una tabla de imágenes)
+SOLUTION_SHEET_GAP = 0.1    # separación entre soluciones de una hoja (fracción del tamaño de cada una)
 DOCX_IMAGE_WIDTH   = 6    # inches
 DOCX_SOL_IMG_WIDTH = 1.8  # inches
 DOCX_TITLE_LEVEL   = 2
-DOCX_PARA_ALIGN    = WD_PARAGRAPH_ALIGNMENT.CENTER
-DOCX_TABLE_ALIGN   = WD_TABLE_ALIGNMENT.CENTER
+DOCX_PARA_ALIGN    = "CENTER"  # nombre de WD_PARAGRAPH_ALIGNMENT (se resuelve en export_docx)
+DOCX_TABLE_ALIGN   = "CENTER"  # nombre de WD_TABLE_ALIGNMENT
+DOCX_VOLUME_SIZE   = None      # puzzles por volumen DOCX (memoria acotada en libros grandes); None = un solo documento
+RENDERER           = "pillow"  # imágenes de puzzles y soluciones: "pillow" (raster.py) o "matplotlib"
+RASTER_DPI         = 100       # píxeles por pulgada de raster.py (100 = savefig por defecto)
+RASTER_FONT        = "DejaVuSans.ttf"  # la fuente por defecto de matplotlib
+RENDER_WORKERS     = 1         # procesos que dibujan las imágenes del DOCX (1 = en este proceso)
+RENDER_BUFFER      = 64        # imágenes dibujadas por adelantado como máximo
+
+# Instrumentación (metrics.py): tiempos por etapa y contadores en un informe JSON/CSV
+INSTRUMENTATION    = False
+INSTRUMENTATION_REPORT = "run_report"  # se escriben run_report.json y run_report.csv
 
 TQDM_COLS         = 80
\ No newline at end of file
@@ -1,13 +1,27 @@
 # data_loader.py
 
 import json, sys
-from wordfreq import top_n_list
-import spacy
+from itertools import islice
+from typing import Iterable, Iterator
 
-from config import WORD_SOURCE, WORD_SOURCE_FILE, MAX_RAW_WORDS, BLACKLIST_FILE
+from config import (WORD_SOURCE, WORD_SOURCE_FILE, MAX_RAW_WORDS, BLACKLIST_FILE, SPACY_MODEL,
+                    MIN_WORD_LENGTH, MAX_WORD_LENGTH)
 
-# Carga modelo spaCy (en one-liner)
-nlp = spacy.load("es_core_news_lg", disable=["parser","ner","lemmatizer"])
+# Búfer de lectura grande para listas de palabras enormes
+READ_BUFFER_SIZE = 1 << 20
+
+# Componentes que no intervienen en doc[0].pos_ (se excluyen al cargar el modelo)
+NLP_EXCLUDE = ["parser", "ner", "lemmatizer"]
+
+_nlp = None
+
+def get_nlp():
+    """Pipeline spaCy compartido, cargado en el primer uso (solo lo necesario para el POS)."""
+    global _nlp
+    if _nlp is None:
+        import spacy
+        _nlp = spacy.load(SPACY_MODEL, exclude=NLP_EXCLUDE)
+    return _nlp
 
 def load_blacklist() -> set[str]:
     try:
@@ -17,11 +31,31 @@ def load_blacklist() -> set[str]:
     except Exception:
         return set()
 
-def get_raw_words() -> list[str]:
+def is_candidate_word(w: str, blacklist: set[str]) -> bool:
+    """Filtros baratos previos al POS: longitud, ASCII alfabético y lista negra."""
+    return (MIN_WORD_LENGTH <= len(w) <= MAX_WORD_LENGTH
+            and w.isascii() and w.isalpha()
+            and w.lower() not in blacklist)
+
+def iter_raw_words() -> Iterator[str]:
+    """Recorre la fuente de palabras sin materializarla en memoria."""
     if WORD_SOURCE == "wordfreq":
-        return top_n_list("es", MAX_RAW_WORDS)
+        from wordfreq import iter_wordlist
+        from wordfreq.numbers import has_digit_sequence
+        # Mismo criterio que top_n_list, pero sin construir la lista completa
+        words = (w for w in iter_wordlist("es") if not has_digit_sequence(w))
+        yield from islice(words, MAX_RAW_WORDS)
+        return
     try:
-        with open(WORD_SOURCE_FILE, encoding="utf-8") as f:
-            return [w.strip() for w in f if w.strip()]
+        with open(WORD_SOURCE_FILE, encoding="utf-8", buffering=READ_BUFFER_SIZE) as f:
+            for line in f:
+                w = line.strip()
+                if w:
+                    yield w
     except FileNotFoundError:
         sys.exit(f"Error: no existe {WORD_SOURCE_FILE}")
+
+def iter_candidate_words(blacklist: set[str], raw: Iterable[str] | None = None) -> Iterator[str]:
+    """Palabras de la fuente (o de `raw`) que superan los filtros baratos, según se leen."""
+    source = iter_raw_words() if raw is None else raw
+    return (w for w in source if is_candidate_word(w, blacklist))
@@ -0,0 +1,13 @@
+# deadline.py
+
+import time
+
+
+def make_deadline(seconds: float | None) -> float | None:
+    """Instante (time.perf_counter) en que vence un plazo de `seconds`; None = sin límite."""
+    return None if seconds is None else time.perf_counter() + seconds
+
+
+def expired(deadline: float | None) -> bool:
+    """True si el plazo ya ha vencido."""
+    return deadline is not None and time.perf_counter() >= deadline
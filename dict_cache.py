@@ -0,0 +1,88 @@
+# dict_cache.py
+
+import hashlib
+import json
+import os
+from importlib import metadata
+
+from config import (
+    WORD_SOURCE, WORD_SOURCE_FILE, MAX_RAW_WORDS, BLACKLIST_FILE,
+    MIN_WORD_LENGTH, MAX_WORD_LENGTH, POS_ALLOWED, SPACY_MODEL, DICT_CACHE_DIR
+)
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+def _hash_file(path: str, h) -> None:
+    """Añade el contenido de un fichero al hash (por bloques, sin cargarlo entero)."""
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    except FileNotFoundError:
+        h.update(b'<missing>')
+
+def dict_cache_key() -> str:
+    """Clave del diccionario filtrado: fuente, lista negra, longitudes, POS y modelo spaCy."""
+    h = hashlib.sha256()
+    if WORD_SOURCE == "wordfreq":
+        h.update(f"wordfreq:{_package_version('wordfreq')}:{MAX_RAW_WORDS}".encode())
+    else:
+        h.update(b"file:")
+        _hash_file(WORD_SOURCE_FILE, h)
+    h.update(b"blacklist:")
+    _hash_file(BLACKLIST_FILE, h)
+    params = [MIN_WORD_LENGTH, MAX_WORD_LENGTH, sorted(POS_ALLOWED),
+              SPACY_MODEL, _package_version(SPACY_MODEL)]
+    h.update(json.dumps(params).encode())
+    return h.hexdigest()[:16]
+
+def _dict_path(key: str) -> str:
+    return os.path.join(DICT_CACHE_DIR, f"filtered_{key}.txt")
+
+def _pos_table_path() -> str:
+    model = os.path.basename(os.path.normpath(SPACY_MODEL))
+    return os.path.join(DICT_CACHE_DIR, f"pos_{model}-{_package_version(SPACY_MODEL)}.tsv")
+
+def load_cached_dict(key: str) -> list[str] | None:
+    """Devuelve el diccionario filtrado guardado para `key`, o None si no existe."""
+    try:
+        with open(_dict_path(key), encoding='utf-8') as f:
+            return [w.rstrip('\n') for w in f]
+    except FileNotFoundError:
+        return None
+
+def save_cached_dict(key: str, words: list[str]) -> None:
+    """Guarda el diccionario filtrado de forma atómica."""
+    os.makedirs(DICT_CACHE_DIR, exist_ok=True)
+    path = _dict_path(key)
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for w in words:
+            f.write(w + "\n")
+    os.replace(tmp, path)
+
+def load_pos_table() -> dict[str, tuple[str, str]]:
+    """Tabla palabra -> (POS, primer token) ya etiquetada con el modelo actual."""
+    table: dict[str, tuple[str, str]] = {}
+    try:
+        with open(_pos_table_path(), encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) == 3:
+                    table[parts[0]] = (parts[1], parts[2])
+    except FileNotFoundError:
+        pass
+    return table
+
+def append_pos_table(entries: list[tuple[str, tuple[str, str]]]) -> None:
+    """Añade al final de la tabla POS solo las palabras recién etiquetadas."""
+    if not entries:
+        return
+    os.makedirs(DICT_CACHE_DIR, exist_ok=True)
+    with open(_pos_table_path(), 'a', encoding='utf-8') as f:
+        for word, (pos, token) in entries:
+            f.write(f"{word}\t{pos}\t{token}\n")
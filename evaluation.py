@@ -113,4 +113,81 @@ def evaluate_puzzle(puzzle: list[list[str]], locations: dict, words_placed: int)
     
     spatial_score_val = _calculate_spatial_score(puzzle, current_locations)
     
-    return words_score_val + crossings * 30 + direction_balance_val + density_bonus_val + spatial_score_val
\ No newline at end of file
+    return words_score_val + crossings * 30 + direction_balance_val + density_bonus_val + spatial_score_val
+
+class PuzzleScorer:
+    """Same score as evaluate_puzzle, kept up to date as words are added or removed.
+    Tracks per-cell usage, filled cells, letters laid, per-direction counts and the
+    centroid sums, so add/remove cost O(word length) and score() is O(#directions)."""
+
+    def __init__(self, rows: int, columns: int, locations: dict | None = None):
+        self.rows = rows
+        self.columns = columns
+        self.locations: dict = {}
+        self.cell_usage: dict[tuple[int, int], int] = {}
+        self.filled_cells = 0
+        self.letters = 0  # letter cells counted with multiplicity
+        self.sum_r = 0
+        self.sum_c = 0
+        self.dir_usage = {d: 0 for d in DIRECTIONS}
+        for word, location in (locations or {}).items():
+            self.add(word, location)
+
+    def _walk(self, word: str, location: tuple[tuple[int, int], tuple[int, int]], sign: int) -> None:
+        (r0, c0), (rf, cf) = location
+        dr = (rf > r0) - (rf < r0)
+        dc = (cf > c0) - (cf < c0)
+        usage = self.cell_usage
+        for k in range(len(word)):
+            cell = (r0 + dr*k, c0 + dc*k)
+            count = usage.get(cell, 0) + sign
+            if count == 0:
+                del usage[cell]
+                self.filled_cells -= 1
+            else:
+                if count == 1 and sign > 0:
+                    self.filled_cells += 1
+                usage[cell] = count
+            self.sum_r += sign * cell[0]
+            self.sum_c += sign * cell[1]
+        self.letters += sign * len(word)
+        if (dr, dc) in self.dir_usage:
+            self.dir_usage[(dr, dc)] += sign
+
+    def add(self, word: str, location: tuple[tuple[int, int], tuple[int, int]]) -> None:
+        """Add a placed word (replaces it if it was already there)."""
+        if word in self.locations:
+            self.remove(word)
+        self.locations[word] = location
+        self._walk(word, location, 1)
+
+    def remove(self, word: str) -> None:
+        """Remove a placed word."""
+        self._walk(word, self.locations.pop(word), -1)
+
+    def score(self, words_placed: int | None = None) -> float:
+        """evaluate_puzzle(puzzle, locations, words_placed) for the current words
+        (`words_placed` defaults to the number of words)."""
+        if words_placed is None:
+            words_placed = len(self.locations)
+        words_score_val = _calculate_words_score(words_placed, self.locations, WORDS_PER_PUZZLE)
+
+        crossings = self.letters - self.filled_cells
+        density = 0.0
+        if self.rows > 0 and self.columns > 0:
+            density = self.filled_cells / (self.rows * self.columns)
+        density_bonus_val = _calculate_density_bonus(density)
+
+        direction_balance_val = 0.0
+        used = [v for v in self.dir_usage.values() if v > 0]
+        if used:
+            direction_balance_val = float(100 * len(used) - 50 * (max(self.dir_usage.values()) - min(used)))
+
+        spatial_score_val = 0.0
+        if self.locations and self.rows > 0 and self.columns > 0:
+            avg_r = self.sum_r / self.letters if self.letters > 0 else self.rows / 2.0
+            avg_c = self.sum_c / self.letters if self.letters > 0 else self.columns / 2.0
+            center_distance = ((avg_r - self.rows / 2.0) ** 2 + (avg_c - self.columns / 2.0) ** 2) ** 0.5
+            spatial_score_val = 300.0 - min(300.0, center_distance * 30.0)
+
+        return words_score_val + crossings * 30 + direction_balance_val + density_bonus_val + spatial_score_val
@@ -1,57 +1,182 @@
 # export_docx.py
 
+import gc
 import io
 import math
+from collections import deque
+from multiprocessing import Pool
 import matplotlib.pyplot as plt
 from docx import Document
 from docx.shared import Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_PARAGRAPH_ALIGNMENT
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
 from tqdm import tqdm
-from docx2pdf import convert
+from xml.sax.saxutils import escape
 
 from config import *
 from drawing import draw_puzzle, draw_solution
+import metrics
+
+# config.py guarda los alineamientos por nombre para no importar python-docx
+PARA_ALIGN = getattr(WD_PARAGRAPH_ALIGNMENT, DOCX_PARA_ALIGN)
+TABLE_ALIGN = getattr(WD_TABLE_ALIGNMENT, DOCX_TABLE_ALIGN)
+
+def puzzle_image(puzzle) -> io.BytesIO:
+    """PNG del tablero con el renderizador configurado."""
+    if RENDERER == "pillow":
+        from raster import puzzle_png
+        return io.BytesIO(puzzle_png(puzzle, PDF_PUZZLE_FONT))
+    fig = plt.figure(figsize=(PUZZLE_COLUMNS/2, PUZZLE_ROWS/2))
+    ax = fig.add_axes([0,0,1,1])
+    draw_puzzle(ax, puzzle, PDF_PUZZLE_FONT)
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight')
+    plt.close(fig)
+    buf.seek(0)
+    return buf
+
+def solution_image(puzzle, locations, number: int) -> io.BytesIO:
+    """PNG de la solución (con la etiqueta "Puzzle N") con el renderizador configurado."""
+    if RENDERER == "pillow":
+        from raster import solution_png
+        return io.BytesIO(solution_png(puzzle, locations, f"Puzzle {number}"))
+    fig = plt.figure(figsize=(3,2.5))
+    ax = fig.add_axes([0,0,1,1])
+    draw_solution(ax, puzzle, locations)
+    ax.text(-0.1,0.5,f"Puzzle {number}",
+            va='center',ha='right',rotation=90,
+            fontsize=PDF_WORDLIST_FONT,
+            transform=ax.transAxes)
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight')
+    plt.close(fig)
+    buf.seek(0)
+    return buf
+
+def solution_sheet(group, first: int) -> io.BytesIO:
+    """PNG de una página de soluciones (SOLUTION_SHEETS): las de `group` (tablero,
+    ubicaciones) en una rejilla de SOLUTION_COLS columnas, en una sola figura."""
+    if RENDERER == "pillow":
+        from raster import solution_sheet_png
+        return io.BytesIO(solution_sheet_png(group, first))
+    # Cada hueco es la miniatura de solution_image (3×2,5 pulgadas) más un margen
+    # a la izquierda para la etiqueta, así que letras y etiquetas miden lo mismo
+    # que en las imágenes sueltas y no se pisan
+    cols = SOLUTION_COLS
+    rows = math.ceil(len(group)/cols)
+    thumb_w, thumb_h, label_w = 3, 2.5, 0.5
+    slot_w, slot_h = label_w + thumb_w, thumb_h
+    gap_w, gap_h = SOLUTION_SHEET_GAP*slot_w, SOLUTION_SHEET_GAP*slot_h
+    fig_w, fig_h = cols*slot_w + (cols-1)*gap_w, rows*slot_h + (rows-1)*gap_h
+    fig = plt.figure(figsize=(fig_w, fig_h))
+    for i, (puzzle, locations) in enumerate(group):
+        r, c = divmod(i, cols)
+        left = c*(slot_w + gap_w) + label_w
+        bottom = fig_h - (r+1)*slot_h - r*gap_h
+        ax = fig.add_axes([left/fig_w, bottom/fig_h, thumb_w/fig_w, thumb_h/fig_h])
+        draw_solution(ax, puzzle, locations)
+        ax.text(-0.1,0.5,f"Puzzle {first+i}",
+                va='center',ha='right',rotation=90,
+                fontsize=PDF_WORDLIST_FONT,
+                transform=ax.transAxes)
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')  # sin recortar: la hoja tiene siempre `cols` huecos de ancho
+    plt.close(fig)
+    buf.seek(0)
+    return buf
+
+def _render(task) -> bytes:
+    """Tarea del pool: ("puzzle", tablero), ("solution", tablero, ubicaciones, número)
+    o ("sheet", [(tablero, ubicaciones), ...], primer número)."""
+    if task[0] == "puzzle":
+        return puzzle_image(task[1]).getvalue()
+    if task[0] == "sheet":
+        return solution_sheet(task[1], task[2]).getvalue()
+    _, puzzle, locations, number = task
+    return solution_image(puzzle, locations, number).getvalue()
+
+def render_images(tasks, workers: int = RENDER_WORKERS, buffer: int = RENDER_BUFFER):
+    """PNGs de `tasks` en el mismo orden. Con workers > 1 se dibujan en un pool de
+    procesos, con como mucho `buffer` imágenes pendientes o sin recoger."""
+    if workers <= 1:
+        yield from map(_render, tasks)
+        return
+    with Pool(workers) as pool:
+        pending = deque()
+        for task in tasks:
+            if len(pending) >= buffer:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(_render, (task,)))
+        while pending:
+            yield pending.popleft().get()
+
+def _add_table(doc, rows: int, cols: int, texts: list[str], align=PARA_ALIGN, valign=None) -> list:
+    """Tabla rows×cols con todas sus filas construidas en un solo XML (table.rows
+    y .cells rehacen las listas de proxies en cada acceso). Las celdas de `texts`
+    (por filas; "" = celda vacía que se rellenará) llevan `align` y `valign`.
+    Devuelve los w:tc en el mismo orden."""
+    table = doc.add_table(rows=0, cols=cols)
+    table.alignment = TABLE_ALIGN
+    table.autofit = False
+    tbl = table._tbl
+    width = tbl.tblGrid.gridCol_lst[0].w.twips
+    v_align = f'<w:vAlign w:val="{valign.xml_value}"/>' if valign is not None else ""
+    filled = (f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/>{v_align}</w:tcPr>'
+              f'<w:p><w:pPr><w:jc w:val="{align.xml_value}"/></w:pPr>{{}}</w:p></w:tc>')
+    empty = f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr><w:p/></w:tc>'
+    xml = []
+    for r in range(rows):
+        xml.append("<w:tr>")
+        for i in range(r*cols, (r+1)*cols):
+            if i >= len(texts):
+                xml.append(empty)
+            else:
+                xml.append(filled.format(f"<w:r><w:t>{escape(texts[i])}</w:t></w:r>" if texts[i] else ""))
+        xml.append("</w:tr>")
+    tbl.extend(parse_xml(f"<w:tbl {nsdecls('w')}>{''.join(xml)}</w:tbl>"))
+    return [tc for tr in tbl.tr_lst for tc in tr.tc_lst]
+
+def _write_docx(all_puzzles, name: str, first: int = 1, title: str = TITLE_DOCX) -> None:
+    """Un documento con portada, puzzles y soluciones, numerados desde `first`."""
+    # las imágenes se dibujan aparte (en paralelo si RENDER_WORKERS > 1), en el orden del documento
+    tasks = [("puzzle", puzzle) for puzzle, _, _ in all_puzzles]
+    if SOLUTION_SHEETS:
+        tasks += [("sheet", [(puzzle, locations) for puzzle, _, locations in all_puzzles[start:start+SOLUTION_PER_PAGE]],
+                   first+start)
+                  for start in range(0, len(all_puzzles), SOLUTION_PER_PAGE)]
+    else:
+        tasks += [("solution", puzzle, locations, n)
+                  for n, (puzzle, _, locations) in enumerate(all_puzzles, start=first)]
+    images = render_images(tasks)
 
-def create_docx(all_puzzles, name: str = f"{TOTAL_PUZZLES}_word_search_puzzles.docx"):
     doc = Document()
     # cover
-    para = doc.add_heading(TITLE_DOCX, level=1)
+    para = doc.add_heading(title, level=1)
     para.alignment = WD_ALIGN_PARAGRAPH.CENTER
     doc.add_page_break()
 
     # puzzles
     for idx, (puzzle, words, _) in enumerate(
         tqdm(all_puzzles, desc="DOCX: puzzles", unit="puzzle", ncols=TQDM_COLS, position=0, leave=True),
-        start=1
+        start=first
     ):
         para = doc.add_heading(f'{TITLE_DOCX} Nº: {idx} [{len(words)}]', level=DOCX_TITLE_LEVEL)
         para.alignment = WD_ALIGN_PARAGRAPH.CENTER
         # image
-        fig = plt.figure(figsize=(PUZZLE_COLUMNS/2, PUZZLE_ROWS/2))
-        ax = fig.add_axes([0,0,1,1])
-        draw_puzzle(ax, puzzle, PDF_PUZZLE_FONT)
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png', bbox_inches='tight')
-        plt.close(fig)
-        buf.seek(0)
+        with metrics.stage("render"):
+            png = next(images)
 
         p = doc.add_paragraph()
         r = p.add_run()
-        r.add_picture(buf, width=Inches(DOCX_IMAGE_WIDTH))
-        p.alignment = DOCX_PARA_ALIGN
+        r.add_picture(io.BytesIO(png), width=Inches(DOCX_IMAGE_WIDTH))
+        p.alignment = PARA_ALIGN
 
         # word table
         cols = SEARCH_WORDS_COLS
         rows = math.ceil(len(words)/cols)
-        table = doc.add_table(rows=rows, cols=cols)
-        table.alignment = DOCX_TABLE_ALIGN
-        table.autofit = False
-        sorted_words = sorted(words)
-        for i, w in enumerate(sorted_words):
-            cell = table.rows[i//cols].cells[i%cols]
-            cell.text = w.upper()
-            cell.paragraphs[0].alignment = DOCX_PARA_ALIGN
+        _add_table(doc, rows, cols, [w.upper() for w in sorted(words)])
 
     # solutions
     doc.add_page_break()
@@ -69,39 +194,64 @@ def create_docx(all_puzzles, name: str = f"{TOTAL_PUZZLES}_word_search_puzzles.d
         if page_idx>1:
             doc.add_page_break()
         group = all_puzzles[start:start+per_page]
-        table = doc.add_table(rows=rows, cols=cols)
-        table.alignment = DOCX_TABLE_ALIGN
-        table.autofit = False
-
-        for i,(puz,_,locs) in enumerate(group):
-            fig = plt.figure(figsize=(3,2.5))
-            ax = fig.add_axes([0,0,1,1])
-            draw_solution(ax, puz, locs)
-            ax.text(-0.1,0.5,f"Puzzle {start+i+1}",
-                    va='center',ha='right',rotation=90,
-                    fontsize=PDF_WORDLIST_FONT,
-                    transform=ax.transAxes)
-            buf = io.BytesIO()
-            fig.savefig(buf, format='png', bbox_inches='tight')
-            plt.close(fig)
-            buf.seek(0)
-
-            cell = table.rows[i//cols].cells[i%cols]
-            run = cell.paragraphs[0].add_run()
-            run.add_picture(buf, width=Inches(DOCX_SOL_IMG_WIDTH))
-            cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-            cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.JUSTIFY_HI
-            para = cell.paragraphs[0]
-            para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        if SOLUTION_SHEETS:
+            # una imagen por página; cada solución ocupa lo mismo que en la tabla
+            with metrics.stage("render"):
+                png = next(images)
+            p = doc.add_paragraph()
+            p.add_run().add_picture(io.BytesIO(png),
+                                    width=Inches(DOCX_SOL_IMG_WIDTH*(cols + (cols-1)*SOLUTION_SHEET_GAP)))
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            continue
+        cells = _add_table(doc, rows, cols, [""] * len(group),
+                           WD_ALIGN_PARAGRAPH.CENTER, WD_ALIGN_VERTICAL.CENTER)
+
+        for i in range(len(group)):
+            with metrics.stage("render"):
+                png = next(images)
+
+            inline = doc.part.new_pic_inline(io.BytesIO(png), width=Inches(DOCX_SOL_IMG_WIDTH))
+            cells[i].p_lst[0].add_r().add_drawing(inline)
 
     doc.save(name)
     tqdm.write(f"Word document generated: {name}")
 
-    pdf_name = name.replace(".docx", ".pdf")
-    try:
-        tqdm.write(f"Converting {name} to {pdf_name}...")
-        convert(name, pdf_name)
-        tqdm.write(f"PDF document generated: {pdf_name}")
-    except Exception as e:
-        tqdm.write(f"Error converting DOCX to PDF: {e}")
-        tqdm.write("Please ensure you have Microsoft Word installed and accessible, or LibreOffice for non-Windows systems, for docx2pdf to function correctly.")
+def create_docx(all_puzzles, name: str = f"{TOTAL_PUZZLES}_word_search_puzzles.docx",
+                volume_size: int | None = DOCX_VOLUME_SIZE):
+    """
+    Escribe el libro en DOCX y después el PDF.
+    Con `volume_size`, el libro se parte en volúmenes de ese número de puzzles
+    (nombre_vol1.docx, ...), cada uno con sus soluciones y la numeración del libro
+    completo; cada volumen se guarda y se libera antes de empezar el siguiente,
+    así que la memoria no crece con el tamaño del libro.
+    """
+    names = []
+    if volume_size and len(all_puzzles) > volume_size:
+        base = name.removesuffix(".docx")
+        volumes = math.ceil(len(all_puzzles) / volume_size)
+        for v, start in enumerate(range(0, len(all_puzzles), volume_size), start=1):
+            names.append(f"{base}_vol{v}.docx")
+            _write_docx(all_puzzles[start:start+volume_size], names[-1], first=start+1,
+                        title=f"{TITLE_DOCX} ({v}/{volumes})")
+            gc.collect()  # el Document de python-docx tiene ciclos: liberarlo antes del siguiente
+    else:
+        names.append(name)
+        _write_docx(all_puzzles, name)
+
+    if PDF_WRITER == "native":
+        # el escritor propio va página a página: un solo PDF para todo el libro
+        from export_pdf import create_pdf
+        with metrics.stage("pdf"):
+            create_pdf(all_puzzles, name.replace(".docx", ".pdf"))
+        return
+    for name in names:
+        pdf_name = name.replace(".docx", ".pdf")
+        try:
+            from docx2pdf import convert
+            tqdm.write(f"Converting {name} to {pdf_name}...")
+            with metrics.stage("pdf"):
+                convert(name, pdf_name)
+            tqdm.write(f"PDF document generated: {pdf_name}")
+        except Exception as e:
+            tqdm.write(f"Error converting DOCX to PDF: {e}")
+            tqdm.write("Please ensure you have Microsoft Word installed and accessible, or LibreOffice for non-Windows systems, for docx2pdf to function correctly.")
@@ -0,0 +1,299 @@
+# export_pdf.py
+
+import hashlib
+import io
+import math
+import os
+import zlib
+
+from fontTools import subset
+from fontTools.ttLib import TTFont
+from tqdm import tqdm
+
+from config import *
+
+POINTS = 72                    # puntos por pulgada
+BORDER_PT = 1.5                # borde del tablero (grosor por defecto de matplotlib)
+SOLUTION_FIGSIZE = (3.0, 2.5)  # figura de cada solución en export_docx: letras y líneas a su escala
+SOLUTION_LINE_PT = 2.0         # linewidth=2 de las líneas rojas
+MARGIN = 0.05                  # margen superior e inferior de las páginas de soluciones (fracción)
+
+
+def _font_path(filename: str) -> str:
+    """La fuente tal cual, o la que trae matplotlib (DejaVu)."""
+    if os.path.isfile(filename):
+        return filename
+    import matplotlib
+    return os.path.join(matplotlib.get_data_path(), "fonts", "ttf", filename)
+
+
+def _escape(text: bytes) -> bytes:
+    return text.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class _Font:
+    """Fuente TrueType con WinAnsiEncoding. Apunta los caracteres usados para
+    incrustar al final un único subconjunto con solo esos glifos."""
+
+    def __init__(self, path: str, resource: str):
+        self.path, self.resource = path, resource
+        font = TTFont(path, lazy=True)
+        self.cmap = font.getBestCmap()
+        self.advance = {g: a for g, (a, _) in font["hmtx"].metrics.items()}
+        head, os2 = font["head"], font["OS/2"]
+        self.upm = head.unitsPerEm
+        self.bbox = (head.xMin, head.yMin, head.xMax, head.yMax)
+        self.ascent, self.descent = font["hhea"].ascent, font["hhea"].descent
+        self.cap_height = getattr(os2, "sCapHeight", 0) or self.ascent
+        self.name = font["name"].getDebugName(6) or os.path.splitext(os.path.basename(path))[0]
+        self.used: set[str] = set()
+
+    def _units(self, ch: str) -> int:
+        glyph = self.cmap.get(ord(ch))
+        return self.advance.get(glyph, 0) if glyph else 0
+
+    def width(self, text: str, size: float) -> float:
+        return sum(self._units(ch) for ch in text) * size / self.upm
+
+    def encode(self, text: str) -> bytes:
+        self.used.update(text)
+        return _escape(text.encode("cp1252", "replace"))
+
+    def embed(self, writer: "PdfWriter", font_id: int) -> None:
+        """Subconjunto con los caracteres usados, incrustado una sola vez."""
+        font = TTFont(self.path)
+        options = subset.Options()
+        options.notdef_outline = True
+        options.drop_tables += ["FFTM"]  # marca de FontForge que fontTools no sabe recortar
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes={ord(ch) for ch in self.used} | {32})
+        subsetter.subset(font)
+        buf = io.BytesIO()
+        font.save(buf)
+        data = buf.getvalue()
+
+        # Prefijo de 6 letras que marca un subconjunto (ISO 32000, 9.6.4)
+        digest = hashlib.md5("".join(sorted(self.used)).encode("utf-8")).digest()
+        tag = "".join(chr(65 + b % 26) for b in digest[:6])
+        base = f"{tag}+{self.name}".encode("ascii", "ignore").replace(b" ", b"")
+
+        file_id, descriptor_id = writer.reserve(), writer.reserve()
+        writer.stream(file_id, data, b"/Length1 %d" % len(data))
+        scale = 1000 / self.upm
+        writer.write(descriptor_id, b"<< /Type /FontDescriptor /FontName /%s /Flags 32 "
+                     b"/FontBBox [%d %d %d %d] /ItalicAngle 0 /Ascent %d /Descent %d "
+                     b"/CapHeight %d /StemV 80 /FontFile2 %d 0 R >>" % (
+                         base, *(round(v * scale) for v in self.bbox),
+                         round(self.ascent * scale), round(self.descent * scale),
+                         round(self.cap_height * scale), file_id))
+        widths = []
+        for code in range(32, 256):
+            try:
+                ch = bytes([code]).decode("cp1252")
+            except UnicodeDecodeError:
+                ch = ""
+            widths.append(b"%d" % round(self._units(ch) * scale) if ch else b"0")
+        writer.write(font_id, b"<< /Type /Font /Subtype /TrueType /BaseFont /%s "
+                     b"/FirstChar 32 /LastChar 255 /Widths [%s] /Encoding /WinAnsiEncoding "
+                     b"/FontDescriptor %d 0 R >>" % (base, b" ".join(widths), descriptor_id))
+
+
+class PdfWriter:
+    """PDF mínimo que escribe cada página en cuanto está lista. Solo quedan en
+    memoria los números de objeto de las páginas y los caracteres usados, así
+    que las fuentes, el árbol de páginas y la tabla xref se escriben al cerrar."""
+
+    def __init__(self, path: str, page_size: tuple[float, float] = PDF_PAGE_SIZE):
+        self.file = open(path, "wb")
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self.offsets: dict[int, int] = {}
+        self.next_id = 1
+        self.width, self.height = (s * POINTS for s in page_size)
+        self.catalog_id, self.pages_id = self.reserve(), self.reserve()
+        self.page_ids: list[int] = []
+        self.fonts = {
+            weight: _Font(_font_path(filename), f"F{i}")
+            for i, (weight, filename) in enumerate(PDF_FONT_FILES.items(), start=1)
+        }
+        self.font_ids = {weight: self.reserve() for weight in self.fonts}
+
+    def reserve(self) -> int:
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+
+    def write(self, obj_id: int, body: bytes) -> None:
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(b"%d 0 obj\n%s\nendobj\n" % (obj_id, body))
+
+    def stream(self, obj_id: int, data: bytes, extra: bytes = b"") -> None:
+        data = zlib.compress(data)
+        self.write(obj_id, b"<< /Length %d /Filter /FlateDecode %s >>\nstream\n%s\nendstream"
+                   % (len(data), extra, data))
+
+    def add_page(self, content: bytes) -> None:
+        content_id, page_id = self.reserve(), self.reserve()
+        self.stream(content_id, content)
+        fonts = b" ".join(b"/%s %d 0 R" % (f.resource.encode(), self.font_ids[w])
+                          for w, f in self.fonts.items())
+        self.write(page_id, b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] "
+                   b"/Resources << /Font << %s >> >> /Contents %d 0 R >>"
+                   % (self.pages_id, self.width, self.height, fonts, content_id))
+        self.page_ids.append(page_id)
+
+    def close(self) -> None:
+        for weight, font in self.fonts.items():
+            font.embed(self, self.font_ids[weight])
+        kids = b" ".join(b"%d 0 R" % i for i in self.page_ids)
+        self.write(self.pages_id, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.page_ids)))
+        self.write(self.catalog_id, b"<< /Type /Catalog /Pages %d 0 R >>" % self.pages_id)
+
+        xref = self.file.tell()
+        self.file.write(b"xref\n0 %d\n0000000000 65535 f \n" % self.next_id)
+        for obj_id in range(1, self.next_id):
+            self.file.write(b"%010d 00000 n \n" % self.offsets[obj_id])
+        self.file.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                        % (self.next_id, self.catalog_id, xref))
+        self.file.close()
+
+
+class Page:
+    """Operadores de contenido de una página (coordenadas en puntos, origen abajo a la izquierda)."""
+
+    def __init__(self, writer: PdfWriter):
+        self.writer = writer
+        self.ops: list[bytes] = []
+
+    def text(self, x: float, y: float, text: str, size: float, weight: str = "normal",
+             align: str = "center", rotate: bool = False) -> None:
+        """Texto centrado en vertical en (x, y); con `rotate`, girado 90° (de abajo arriba)."""
+        font = self.writer.fonts[weight]
+        shift = {"left": 0, "center": 0.5, "right": 1}[align] * font.width(text, size)
+        rise = font.cap_height * size / font.upm / 2
+        if rotate:
+            matrix = b"0 1 -1 0 %.2f %.2f" % (x + rise, y - shift)
+        else:
+            matrix = b"1 0 0 1 %.2f %.2f" % (x - shift, y - rise)
+        self.ops.append(b"BT /%s %.2f Tf %s Tm (%s) Tj ET"
+                        % (font.resource.encode(), size, matrix, font.encode(text)))
+
+    def grid(self, puzzle: list[list[str]], x: float, y: float, cell: float,
+             fontsize: float, border: float,
+             locations: dict[str, tuple[tuple[int, int], tuple[int, int]]] | None = None,
+             line_width: float = 0) -> None:
+        """Tablero con su esquina inferior izquierda en (x, y); con `locations`,
+        las líneas rojas de la solución por debajo de las letras."""
+        rows, cols = len(puzzle), len(puzzle[0])
+        top = y + rows * cell
+        self.ops.append(b"0 0 0 RG %.2f w %.2f %.2f %.2f %.2f re S"
+                        % (border, x, y, cols * cell, rows * cell))
+        if locations:
+            self.ops.append(b"1 0 0 RG %.2f w 2 J" % line_width)
+            for (r0, c0), (rf, cf) in locations.values():
+                self.ops.append(b"%.2f %.2f m %.2f %.2f l S" % (
+                    x + (c0 + 0.5) * cell, top - (r0 + 0.5) * cell,
+                    x + (cf + 0.5) * cell, top - (rf + 0.5) * cell))
+            self.ops.append(b"0 J")
+
+        font = self.writer.fonts["normal"]
+        rise = font.cap_height * fontsize / font.upm / 2
+        ops = [b"0 g BT /%s %.2f Tf" % (font.resource.encode(), fontsize)]
+        for r, row in enumerate(puzzle):
+            cy = top - (r + 0.5) * cell - rise
+            for c, ch in enumerate(row):
+                if ch:
+                    cx = x + (c + 0.5) * cell - font.width(ch, fontsize) / 2
+                    ops.append(b"1 0 0 1 %.2f %.2f Tm (%s) Tj" % (cx, cy, font.encode(ch)))
+        ops.append(b"ET")
+        self.ops.append(b"\n".join(ops))
+
+    def finish(self) -> None:
+        self.writer.add_page(b"\n".join(self.ops))
+        self.ops = []
+
+
+def _title_page(writer: PdfWriter, title: str) -> None:
+    page = Page(writer)
+    page.text(writer.width / 2, writer.height / 2, title, PDF_TITLE_FONT["size"] * 2,
+              PDF_TITLE_FONT.get("weight", "normal"))
+    page.finish()
+
+
+def _puzzle_page(writer: PdfWriter, puzzle: list[list[str]], words: list[str], number: int) -> None:
+    """Título, tablero dentro de PDF_PUZZLE_AREA y debajo la lista de palabras
+    en SEARCH_WORDS_COLS columnas."""
+    W, H = writer.width, writer.height
+    area = PDF_PUZZLE_AREA
+    left, bottom = area["left"] * W, area["bottom"] * H
+    width, height = area["width"] * W, area["height"] * H
+    rows, cols = len(puzzle), len(puzzle[0])
+    cell = min(width / cols, height / rows)
+    x = left + (width - cols * cell) / 2
+    y = bottom + (height - rows * cell) / 2
+
+    page = Page(writer)
+    top_band = H - (bottom + height)
+    page.text(W / 2, H - top_band / 2, f"{TITLE_DOCX} Nº: {number} [{len(words)}]",
+              PDF_TITLE_FONT["size"], PDF_TITLE_FONT.get("weight", "normal"))
+    page.grid(puzzle, x, y, cell, PDF_PUZZLE_FONT, BORDER_PT)
+
+    col_width = width / SEARCH_WORDS_COLS
+    line = PDF_WORDLIST_FONT * 1.6
+    for i, w in enumerate(sorted(words)):
+        r, c = divmod(i, SEARCH_WORDS_COLS)
+        page.text(left + (c + 0.5) * col_width, y - (r + 1.5) * line, w.upper(), PDF_WORDLIST_FONT)
+    page.finish()
+
+
+def _solution_page(writer: PdfWriter, group: list[tuple], first: int) -> None:
+    """Hasta SOLUTION_PER_PAGE soluciones en una rejilla de SOLUTION_COLS columnas.
+    Cada una reproduce la figura de export_docx (SOLUTION_FIGSIZE con sus fuentes
+    y líneas) escalada a su hueco, con la etiqueta "Puzzle N" girada a la izquierda."""
+    W, H = writer.width, writer.height
+    cols = SOLUTION_COLS
+    rows = math.ceil(SOLUTION_PER_PAGE / cols)
+    left, width = PDF_PUZZLE_AREA["left"] * W, PDF_PUZZLE_AREA["width"] * W
+    bottom, height = MARGIN * H, (1 - 2 * MARGIN) * H
+    slot_w, slot_h = width / cols, height / rows
+    fig_w, fig_h = (s * POINTS for s in SOLUTION_FIGSIZE)
+
+    page = Page(writer)
+    for i, (puzzle, _, locations) in enumerate(group):
+        r, c = divmod(i, cols)
+        p_rows, p_cols = len(puzzle), len(puzzle[0])
+        fig_cell = min(fig_w / p_cols, fig_h / p_rows)
+        label = PDF_WORDLIST_FONT * 1.5  # franja para la etiqueta
+        scale = min((slot_w - label) / (p_cols * fig_cell), slot_h / (p_rows * fig_cell)) * 0.9
+        cell = fig_cell * scale
+
+        sx, sy = left + c * slot_w, bottom + height - (r + 1) * slot_h
+        x = sx + label + (slot_w - label - p_cols * cell) / 2
+        y = sy + (slot_h - p_rows * cell) / 2
+        page.grid(puzzle, x, y, cell, PDF_SOLUTION_FONT * scale, BORDER_PT * scale,
+                  locations, SOLUTION_LINE_PT * scale)
+        page.text(x - label / 2, y + p_rows * cell / 2, f"Puzzle {first + i}",
+                  PDF_WORDLIST_FONT * scale, rotate=True)
+    page.finish()
+
+
+def create_pdf(all_puzzles, name: str = f"{TOTAL_PUZZLES}_word_search_puzzles.pdf") -> None:
+    """
+    Libro en PDF vectorial sin pasar por el DOCX: portada, una página por puzzle
+    y las páginas de soluciones, con las letras como texto y las líneas como trazos.
+    Cada página se escribe en el archivo en cuanto está lista y la fuente
+    (PDF_FONT_FILES) se incrusta una vez, solo con los caracteres usados.
+    """
+    writer = PdfWriter(name)
+    _title_page(writer, TITLE_DOCX)
+    for idx, (puzzle, words, _) in enumerate(
+        tqdm(all_puzzles, desc="PDF: puzzles", unit="puzzle", ncols=TQDM_COLS),
+        start=1
+    ):
+        _puzzle_page(writer, puzzle, words, idx)
+
+    _title_page(writer, "Solutions")
+    for start in tqdm(range(0, len(all_puzzles), SOLUTION_PER_PAGE),
+                      desc="PDF: solutions", unit="pages", ncols=TQDM_COLS):
+        _solution_page(writer, all_puzzles[start:start + SOLUTION_PER_PAGE], start + 1)
+    writer.close()
+    tqdm.write(f"PDF document generated: {name}")
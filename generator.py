@@ -1,71 +1,216 @@
 # generator.py
 
-import spacy
+import random
+import time
+from typing import Iterable
+from multiprocessing import Pool
+from tqdm import tqdm
 
-nlp = spacy.load('es_core_news_lg')
-from config import (MIN_WORD_LENGTH, MAX_WORD_LENGTH, POS_ALLOWED, DIRECTIONS, MAX_FALLBACK_TRIES,
-                    PUZZLE_ROWS, PUZZLE_COLUMNS, WORDS_PER_PUZZLE, USE_LOOKFOR)
+from config import (POS_ALLOWED, DIRECTIONS,
+                    PUZZLE_ROWS, PUZZLE_COLUMNS, WORDS_PER_PUZZLE, USE_LOOKFOR, USE_VECTORIZED,
+                    USE_BACKTRACKING, PUZZLE_TIME_BUDGET, USE_LOCAL_SEARCH, USE_BEAM,
+                    USE_DICT_CACHE, POS_WORKERS, POS_CHUNK_SIZE)
 
 # Importamos las funciones de los módulos refactorizados
 from greedy import greedy_word_search
 from placement_utils import try_random_placement
 from word_placement import fill_empty_spaces
 from lookfor import lookfor_sequential_word_search
+from backtracking import backtracking_word_search
+from data_loader import iter_raw_words, iter_candidate_words, get_nlp
+from deadline import make_deadline, expired
+import metrics
+from dict_cache import (dict_cache_key, load_cached_dict, save_cached_dict,
+                        load_pos_table, append_pos_table)
+
+def _tag_words(words: list[str]) -> list[tuple[str, str]]:
+    """Etiqueta un bloque de palabras: (POS, primer token) de cada una."""
+    nlp = get_nlp()
+    return [(doc[0].pos_, doc[0].text) for doc in nlp.pipe(words, batch_size=2000)]
+
+def _tag_processes(n_words: int, workers: int) -> int:
+    """Procesos que usa _iter_tagged: con un solo bloque no merece la pena el pool."""
+    return 1 if workers <= 1 or n_words <= POS_CHUNK_SIZE else workers
+
+def _iter_tagged(words: list[str], workers: int):
+    """Genera (POS, primer token) en el mismo orden que `words`.
+    Con workers > 1 reparte bloques de POS_CHUNK_SIZE en un pool de procesos."""
+    if _tag_processes(len(words), workers) == 1:
+        for doc in get_nlp().pipe(words, batch_size=2000, n_process=1):
+            yield doc[0].pos_, doc[0].text
+        return
+    chunks = (words[i:i + POS_CHUNK_SIZE] for i in range(0, len(words), POS_CHUNK_SIZE))
+    with Pool(workers, initializer=get_nlp) as pool:
+        for tagged in pool.imap(_tag_words, chunks):
+            yield from tagged
+
+def build_filtered_dict(
+    raw: Iterable[str],
+    blacklist: set[str],
+    pos_table: dict[str, tuple[str, str]] | None = None,
+    workers: int = POS_WORKERS
+) -> list[str]:
+    """Filtra por longitud, ASCII, lista negra y POS.
+    `raw` puede ser un iterador: solo se guardan en memoria las palabras que
+    superan los filtros baratos. Si se pasa `pos_table` (palabra -> (POS, primer token)), solo las palabras
+    que no estén en ella pasan por spaCy, y se añaden a la tabla."""
+    with metrics.stage("prefilter", exclude="raw_load"):
+        pre = list(iter_candidate_words(blacklist, metrics.timed_iter("raw_load", raw)))
+    if pos_table is None:
+        pos_table = {}
+    unknown = [w for w in dict.fromkeys(pre) if w not in pos_table]
+    if unknown:
+        start = time.perf_counter()
+        with metrics.stage("pos_tagging"):
+            for w, tagged in zip(unknown, _iter_tagged(unknown, workers)):
+                pos_table[w] = tagged
+        elapsed = time.perf_counter() - start
+        tqdm.write(f"🏷️  POS: {len(unknown)} palabras en {elapsed:.1f}s "
+                   f"({len(unknown) / max(elapsed, 1e-9):.0f} palabras/s, {_tag_processes(len(unknown), workers)} proceso(s)).")
 
-def build_filtered_dict(raw: list[str], blacklist: set[str]) -> list[str]:
-    pre = [
-        w for w in raw
-        if MIN_WORD_LENGTH <= len(w) <= MAX_WORD_LENGTH
-           and w.isascii() and w.isalpha()
-           and w.lower() not in blacklist
-    ]
     filtered = []
-    for doc in nlp.pipe(pre, batch_size=2000, n_process=1):
-        if doc[0].pos_ in POS_ALLOWED:
-            filtered.append(doc[0].text)
+    for w in pre:
+        pos, token = pos_table[w]
+        if pos in POS_ALLOWED:
+            filtered.append(token)
+    return filtered
+
+def load_filtered_dict(blacklist: set[str]) -> list[str]:
+    """Devuelve el diccionario filtrado, usando la caché en disco si está activa.
+    En caliente no se lee la fuente ni se carga spaCy; en frío solo se etiquetan
+    las palabras que no estén ya en la tabla POS."""
+    if not USE_DICT_CACHE:
+        return build_filtered_dict(iter_raw_words(), blacklist)
+
+    with metrics.stage("dict_cache"):
+        key = dict_cache_key()
+        cached = load_cached_dict(key)
+    if cached is not None:
+        return cached
+
+    pos_table = load_pos_table()
+    known = len(pos_table)
+    filtered = build_filtered_dict(iter_raw_words(), blacklist, pos_table)
+    append_pos_table(list(pos_table.items())[known:])
+    save_cached_dict(key, filtered)
     return filtered
 
 def generate_word_search(
     words: list[str],
     rows: int = PUZZLE_ROWS,
     columns: int = PUZZLE_COLUMNS,
-    use_lookfor: bool = USE_LOOKFOR
+    use_lookfor: bool = USE_LOOKFOR,
+    use_vectorized: bool = USE_VECTORIZED,
+    use_backtracking: bool = USE_BACKTRACKING,
+    deadline: float | None = None,
+    use_local_search: bool = USE_LOCAL_SEARCH,
+    use_beam: bool = USE_BEAM
 ) -> tuple[list[list[str]], list[str], dict[str, tuple[tuple[int, int], tuple[int, int]]]]:
+    puzzle, placed, locations, _ = _generate_word_search(words, rows, columns, use_lookfor, use_vectorized,
+                                                         use_backtracking, deadline, use_local_search, use_beam)
+    return puzzle, placed, locations
+
+def _generate_word_search(
+    words: list[str],
+    rows: int,
+    columns: int,
+    use_lookfor: bool,
+    use_vectorized: bool,
+    use_backtracking: bool,
+    deadline: float | None,
+    use_local_search: bool,
+    use_beam: bool
+) -> tuple[list[list[str]], list[str], dict[str, tuple[tuple[int, int], tuple[int, int]]], str | None]:
+    """generate_word_search más el estado del resolutor (None si no se usa)."""
+    selection = words
     words = sorted(words, key=lambda w: -len(w))
     placed: list[str] # Type hint for placed, assigned in branches
     # 1) Generación inicial
-    if use_lookfor:
-        puzzle, placed, locations = lookfor_sequential_word_search(words, rows, columns)
-    else:   
-        puzzle, locations = greedy_word_search(words, rows, columns)
-        placed = list(locations.keys()) # Define placed for this branch
-
-    # 2) Asegurar siempre WORDS_PER_PUZZLE
-    current = len(locations)
-    if current < WORDS_PER_PUZZLE:
-        # reconstruimos dir_counts de lo ya colocado
-        dir_counts = {d:0 for d in DIRECTIONS}
-        for ((r0,c0),(rf,cf)) in locations.values():
-            d = ( (rf>r0)-(rf<r0), (cf>c0)-(cf<c0) )
-            dir_counts[d] += 1
-        # intentamos colocar las palabras que faltan
-        for w in words:
-            if len(locations) >= WORDS_PER_PUZZLE:
-                break
-            if w.upper() in locations:
-                continue
-            success = try_random_placement(
-                w, puzzle, rows, columns,
-                locations, dir_counts,
-                max_tries=MAX_FALLBACK_TRIES
-            )
-            if success:
-                # actualizamos dir_counts
-                loc = locations[w.upper()]
-                d = ( (loc[1][0]>loc[0][0]) - (loc[1][0]<loc[0][0]),
-                      (loc[1][1]>loc[0][1]) - (loc[1][1]<loc[0][1]) )
+    solved = False
+    status = None
+    if use_backtracking:
+        # El resolutor usa el orden original: las palabras del final son de repuesto
+        bt_puzzle, bt_placed, bt_locations, status = backtracking_word_search(selection, rows, columns, deadline=deadline)
+        solved = status == "solved"
+        if solved:
+            puzzle, placed, locations = bt_puzzle, bt_placed, bt_locations
+    if not solved:
+        # Sin resolutor, o sin llegar al objetivo: el motor configurado más el relleno aleatorio
+        if use_beam:
+            from beam import beam_word_search  # requiere NumPy
+            puzzle, placed, locations = beam_word_search(words, rows, columns, deadline=deadline)
+        elif use_lookfor and use_vectorized:
+            from lookfor_vectorized import lookfor_vectorized_word_search  # requiere NumPy
+            puzzle, placed, locations = lookfor_vectorized_word_search(words, rows, columns, deadline)
+        elif use_lookfor:
+            puzzle, placed, locations = lookfor_sequential_word_search(words, rows, columns, deadline=deadline)
+        else:
+            puzzle, locations = greedy_word_search(words, rows, columns, deadline)
+            placed = list(locations.keys()) # Define placed for this branch
+
+        # 2) Asegurar siempre WORDS_PER_PUZZLE
+        current = len(locations)
+        if current < WORDS_PER_PUZZLE:
+            # reconstruimos dir_counts de lo ya colocado
+            dir_counts = {d:0 for d in DIRECTIONS}
+            for ((r0,c0),(rf,cf)) in locations.values():
+                d = ( (rf>r0)-(rf<r0), (cf>c0)-(cf<c0) )
                 dir_counts[d] += 1
+            # intentamos colocar las palabras que faltan
+            for w in words:
+                if len(locations) >= WORDS_PER_PUZZLE or expired(deadline):
+                    break
+                if w.upper() in locations:
+                    continue
+                success = try_random_placement(
+                    w, puzzle, rows, columns,
+                    locations, dir_counts
+                )
+                if success:
+                    # actualizamos dir_counts
+                    loc = locations[w.upper()]
+                    d = ( (loc[1][0]>loc[0][0]) - (loc[1][0]<loc[0][0]),
+                          (loc[1][1]>loc[0][1]) - (loc[1][1]<loc[0][1]) )
+                    dir_counts[d] += 1
+
+        # la colocación parcial del resolutor gana si llegó más lejos
+        if use_backtracking and len(bt_locations) > len(locations):
+            puzzle, placed, locations = bt_puzzle, bt_placed, bt_locations
 
-    # 3) Relleno final
+    # 3) Mejora por búsqueda local (devuelve el tablero ya relleno)
+    if use_local_search:
+        from local_search import improve_puzzle  # requiere NumPy
+        puzzle, placed, locations = improve_puzzle(selection, locations, rows, columns, deadline=deadline)
+
+    # 4) Relleno final
     fill_empty_spaces(puzzle, rows, columns)
-    return puzzle, placed, locations
\ No newline at end of file
+    return puzzle, placed, locations, status
+
+def generate_seeded_word_search(
+    job: tuple[list[str], int],
+    rows: int = PUZZLE_ROWS,
+    columns: int = PUZZLE_COLUMNS,
+    use_lookfor: bool = USE_LOOKFOR,
+    use_backtracking: bool = USE_BACKTRACKING,
+    time_budget: float | None = PUZZLE_TIME_BUDGET
+) -> tuple[list[list[str]], list[str], dict[str, tuple[tuple[int, int], tuple[int, int]]], str | None]:
+    """Genera un puzzle reproducible a partir de (palabras, semilla).
+    Toda la aleatoriedad de los motores sale de `random`, así que sembrarlo aquí
+    hace que el puzzle sea el mismo en cualquier proceso (salvo que venza el plazo).
+    Con `time_budget` segundos como máximo; devuelve además un estado: "timeout"
+    si venció el plazo (el resultado depende entonces de la velocidad de la
+    máquina), "infeasible" si el resolutor demostró que la selección no cabe y None
+    en otro caso; si el resolutor agota sus nodos se queda la mejor colocación."""
+    selection, seed = job
+    random.seed(seed)
+    deadline = make_deadline(time_budget)
+    puzzle, placed, locations, solver_status = _generate_word_search(
+        selection, rows, columns, use_lookfor, USE_VECTORIZED, use_backtracking,
+        deadline, USE_LOCAL_SEARCH, USE_BEAM)
+    if expired(deadline):
+        status = "timeout"
+    elif solver_status == "infeasible":
+        status = "infeasible"
+    else:
+        status = None
+    return puzzle, placed, locations, status
@@ -0,0 +1,87 @@
+# geometry.py
+
+from functools import lru_cache
+
+from config import DIRECTIONS, GEOMETRY_CACHE_SIZE
+
+Cell = tuple[int, int]
+Segment = tuple[int, int, tuple[Cell, ...]]  # (r0, c0, celdas)
+
+EMPTY = 0  # valor de celda vacía en los tableros de bytes de los motores NumPy
+
+
+def start_bounds(rows: int, columns: int, length: int, direction: tuple[int, int]) -> tuple[int, int, int, int]:
+    """Rango [r_lo, r_hi) × [c_lo, c_hi) de inicios válidos para una palabra de
+    `length` letras en `direction`. Vacío si la palabra no cabe."""
+    df, dc = direction
+    r_lo, r_hi = max(0, -df*(length-1)), min(rows, rows - df*(length-1))
+    c_lo, c_hi = max(0, -dc*(length-1)), min(columns, columns - dc*(length-1))
+    return r_lo, max(r_lo, r_hi), c_lo, max(c_lo, c_hi)
+
+
+@lru_cache(maxsize=8)
+def _cells(rows: int, columns: int) -> tuple[tuple[Cell, ...], ...]:
+    """Pares (fila, columna) compartidos por todos los segmentos de una forma de tablero."""
+    return tuple(tuple((r, c) for c in range(columns)) for r in range(rows))
+
+
+@lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def segments(rows: int, columns: int, length: int) -> dict[tuple[int, int], list[Segment]]:
+    """Segmentos válidos de longitud `length` agrupados por dirección.
+    Dentro de cada dirección están en orden (fila, columna), el mismo en que los
+    motores recorrían antes el tablero, así que los desempates no cambian."""
+    grid = _cells(rows, columns)
+    by_direction: dict[tuple[int, int], list[Segment]] = {}
+    for df, dc in DIRECTIONS:
+        r_lo, r_hi, c_lo, c_hi = start_bounds(rows, columns, length, (df, dc))
+        by_direction[(df, dc)] = [
+            (r0, c0, tuple(grid[r0 + df*k][c0 + dc*k] for k in range(length)))
+            for r0 in range(r_lo, r_hi)
+            for c0 in range(c_lo, c_hi)
+        ]
+    return by_direction
+
+
+@lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def indexed_segments(
+    rows: int, columns: int, length: int
+) -> tuple[list[tuple[int, int, int, int, tuple[Cell, ...]]], dict[Cell, list[tuple[int, int]]], dict[tuple[int, int], range]]:
+    """Segmentos numerados en el orden de DIRECTIONS, más dos índices:
+    celda -> (segmento, posición de la celda en él) de los que pasan por ella,
+    y dirección -> rango de números."""
+    segs = segments(rows, columns, length)
+    flat: list[tuple[int, int, int, int, tuple[Cell, ...]]] = []
+    spans: dict[tuple[int, int], range] = {}
+    for df, dc in DIRECTIONS:
+        start = len(flat)
+        flat.extend((df, dc, r0, c0, cells) for r0, c0, cells in segs[(df, dc)])
+        spans[(df, dc)] = range(start, len(flat))
+    by_cell: dict[Cell, list[tuple[int, int]]] = {}
+    for i, (_, _, _, _, cells) in enumerate(flat):
+        for k, cell in enumerate(cells):
+            by_cell.setdefault(cell, []).append((i, k))
+    return flat, by_cell, spans
+
+
+def segment_at(rows: int, columns: int, length: int, direction: tuple[int, int], r0: int, c0: int) -> Segment:
+    """Segmento que empieza en (r0, c0); (r0, c0) debe estar dentro de start_bounds."""
+    r_lo, _, c_lo, c_hi = start_bounds(rows, columns, length, direction)
+    return segments(rows, columns, length)[direction][(r0 - r_lo)*(c_hi - c_lo) + (c0 - c_lo)]
+
+
+@lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def segment_arrays(rows: int, columns: int, length: int) -> tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    """La tabla de segments en arrays de NumPy, en el orden de DIRECTIONS (y fila,
+    columna dentro de cada una), para los motores vectorizados.
+    Devuelve (índices planos (N, length), índice de dirección, r0, c0)."""
+    import numpy as np  # requiere NumPy; el resto del módulo no
+    segs = segments(rows, columns, length)
+    cells, dir_idx, r0s, c0s = [], [], [], []
+    for k, d in enumerate(DIRECTIONS):
+        for r0, c0, seg_cells in segs[d]:
+            cells.append([r*columns + c for r, c in seg_cells])
+            dir_idx.append(k)
+            r0s.append(r0)
+            c0s.append(c0)
+    return (np.array(cells, dtype=np.intp).reshape(-1, length), np.array(dir_idx, dtype=np.intp),
+            np.array(r0s, dtype=np.intp), np.array(c0s, dtype=np.intp))
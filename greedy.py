@@ -1,18 +1,22 @@
 # greedy.py
 
 import random
-from config import DIRECTIONS, PUZZLE_ROWS, PUZZLE_COLUMNS, MAX_FALLBACK_TRIES, WORDS_PER_PUZZLE
-from word_placement import fill_empty_spaces
+from config import DIRECTIONS, PUZZLE_ROWS, PUZZLE_COLUMNS, WORDS_PER_PUZZLE
+from word_placement import fill_empty_spaces, place_word
 from greedy_utils import _explore_candidates, _fallback_placement
+from deadline import expired
+import metrics
 
 
 def greedy_word_search(
     words: list[str],
     rows: int = PUZZLE_ROWS,
-    columns: int = PUZZLE_COLUMNS
+    columns: int = PUZZLE_COLUMNS,
+    deadline: float | None = None
 ) -> tuple[list[list[str]], dict[str,tuple[tuple[int,int],tuple[int,int]]]]:
     """Algoritmo greedy para generación de sopas de letras.
-    Garantiza que se coloquen exactamente WORDS_PER_PUZZLE palabras (o todas si hay menos)."""
+    Garantiza que se coloquen exactamente WORDS_PER_PUZZLE palabras (o todas si hay menos).
+    Si vence `deadline` (time.perf_counter), devuelve el mejor intento hasta ese momento."""
         
     # Ordenar palabras por longitud (más largas primero) para mejorar la colocación
     words = sorted(words, key=lambda w: -len(w))
@@ -27,6 +31,7 @@ def greedy_word_search(
         puzzle = [['' for _ in range(columns)] for _ in range(rows)]
         dir_counts = {d: 0 for d in DIRECTIONS}
         locations: dict[str, tuple[tuple[int,int], tuple[int,int]]] = {}
+        letter_index: dict[str, set[tuple[int,int]]] = {}
         
         # Mezclar direcciones para cada intento
         random_directions = list(DIRECTIONS)
@@ -35,12 +40,12 @@ def greedy_word_search(
 
         for word in words:
             # Si ya colocamos suficientes palabras, terminamos
-            if len(locations) >= target_words:
+            if len(locations) >= target_words or expired(deadline):
                 break
                 
             p = word.upper()
 
-            best_candidate_info = _explore_candidates(p, puzzle, rows, columns, random_directions, dir_counts)
+            best_candidate_info = _explore_candidates(p, puzzle, rows, columns, random_directions, dir_counts, letter_index)
 
             if best_candidate_info:
                 _, r0, c0, df, dc = best_candidate_info
@@ -49,23 +54,21 @@ def greedy_word_search(
                 if fallback_info:
                     r0, c0, df, dc = fallback_info
                 else:
+                    if metrics.ENABLED:
+                        metrics.count("words_skipped")
                     continue  # No se pudo colocar la palabra
             
             # 3) Place the word and update direction counter
-            r, c = r0, c0
-            for l_char in p:
-                puzzle[r][c] = l_char
-                r += df; c += dc
-            locations[p] = ((r0, c0), (r0 + df*(len(p)-1), c0 + dc*(len(p)-1)))
+            locations[p] = place_word(p, puzzle, r0, c0, df, dc, letter_index)
             dir_counts[(df, dc)] += 1
         
         # Guardar el mejor resultado hasta ahora
-        if len(locations) > len(best_locations):
+        if best_puzzle is None or len(locations) > len(best_locations):
             best_puzzle = [row[:] for row in puzzle]  # Deep copy
             best_locations = locations.copy()
             
         # Si ya tenemos suficientes palabras, terminamos
-        if len(best_locations) >= target_words:
+        if len(best_locations) >= target_words or expired(deadline):
             break
     
     # 4) Fill empty spaces
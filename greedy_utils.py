@@ -1,6 +1,8 @@
 # greedy_utils.py
 import random
-from config import MAX_FALLBACK_TRIES
+from geometry import segments
+from word_placement import crossing_candidates, feasible_placements, LetterIndex
+import metrics
 
 def _explore_candidates(
     word_upper: str,
@@ -8,28 +10,31 @@ def _explore_candidates(
     rows: int,
     columns: int,
     random_directions: list[tuple[int, int]],
-    dir_counts: dict[tuple[int, int], int]
+    dir_counts: dict[tuple[int, int], int],
+    letter_index: LetterIndex | None = None
 ) -> tuple[int, int, int, int, int] | None:
-    """Explora posiciones válidas y elige el mejor candidato."""
+    """Explora posiciones válidas y elige el mejor candidato.
+    Con índice de letras, solo recorre todo el tablero si no hay candidatos con cruces."""
     candidates: list[tuple[int, int, int, int, int]] = []
-    for df, dc in random_directions:
-        for r0 in range(rows):
-            for c0 in range(columns):
-                rf = r0 + df * (len(word_upper) - 1)
-                cf = c0 + dc * (len(word_upper) - 1)
-                if not (0 <= rf < rows and 0 <= cf < columns):
-                    continue
+    if letter_index is not None:
+        candidates = crossing_candidates(word_upper, puzzle, rows, columns, random_directions, letter_index)
+    if metrics.ENABLED:
+        metrics.count("candidates_scanned", len(candidates))
+    if not candidates:
+        segs = segments(rows, columns, len(word_upper))
+        if metrics.ENABLED:
+            metrics.count("candidates_scanned", sum(len(segs[d]) for d in random_directions))
+        for df, dc in random_directions:
+            for r0, c0, cells in segs[(df, dc)]:
                 match_count = 0
                 ok = True
-                r, c = r0, c0
-                for char_in_word in word_upper:
-                    if puzzle[r][c] == char_in_word:
+                for (r, c), char_in_word in zip(cells, word_upper):
+                    cur = puzzle[r][c]
+                    if cur == char_in_word:
                         match_count += 1
-                    elif puzzle[r][c] != '':
+                    elif cur != '':
                         ok = False
                         break
-                    r += df
-                    c += dc
                 if ok:
                     candidates.append((match_count, r0, c0, df, dc))
 
@@ -48,22 +53,12 @@ def _fallback_placement(
     columns: int,
     random_directions: list[tuple[int, int]]
 ) -> tuple[int, int, int, int] | None:
-    """Intenta colocar la palabra aleatoriamente si no hay candidatos con cruces."""
-    for _ in range(MAX_FALLBACK_TRIES):
-        df, dc = random.choice(random_directions)
-        r0, c0 = random.randrange(rows), random.randrange(columns)
-        rf = r0 + df * (len(word_upper) - 1)
-        cf = c0 + dc * (len(word_upper) - 1)
-        if not (0 <= rf < rows and 0 <= cf < columns):
-            continue
-        ok = True
-        r, c = r0, c0
-        for char_in_word in word_upper:
-            if puzzle[r][c] not in ('', char_in_word):
-                ok = False
-                break
-            r += df
-            c += dc
-        if ok:
-            return r0, c0, df, dc
-    return None
\ No newline at end of file
+    """Coloca la palabra al azar si no hay candidatos con cruces.
+    Sortea de forma uniforme entre las posiciones donde cabe (lo mismo que el
+    antiguo sorteo con rechazo) y devuelve None al instante si no cabe en ninguna."""
+    if metrics.ENABLED:
+        metrics.count("fallback_probes")
+    feasible = feasible_placements(word_upper, puzzle, rows, columns, random_directions)
+    if not feasible:
+        return None
+    return random.choice(feasible)
@@ -0,0 +1,173 @@
+# local_search.py
+
+import random
+import time
+from typing import List, Tuple, Dict
+import numpy as np
+from tqdm import tqdm
+
+from config import (
+    WORDS_PER_PUZZLE,
+    PUZZLE_ROWS, PUZZLE_COLUMNS,
+    DIRECTIONS, VERBOSE,
+    LOCAL_SEARCH_ITERATIONS, LOCAL_SEARCH_TIME_BUDGET, LOCAL_SEARCH_HISTORY
+)
+from deadline import make_deadline, expired
+from evaluation import PuzzleScorer
+from word_placement import place_word, fill_empty_spaces
+from geometry import segment_arrays, EMPTY
+
+Location = Tuple[Tuple[int, int], Tuple[int, int]]
+
+
+def _direction(location: Location) -> Tuple[int, int]:
+    (r0, c0), (rf, cf) = location
+    return (rf > r0) - (rf < r0), (cf > c0) - (cf < c0)
+
+
+def improve_puzzle(
+    words: List[str],
+    locations: Dict[str, Location],
+    rows: int = PUZZLE_ROWS,
+    cols: int = PUZZLE_COLUMNS,
+    iterations: int = LOCAL_SEARCH_ITERATIONS,
+    time_budget: float | None = LOCAL_SEARCH_TIME_BUDGET,
+    deadline: float | None = None,
+    history: int = LOCAL_SEARCH_HISTORY
+) -> Tuple[List[List[str]], List[str], Dict[str, Location]]:
+    """
+    Mejora una colocación ya hecha con búsqueda local de aceptación tardía
+    (late acceptance hill climbing) guiada por evaluation.PuzzleScorer.
+    Cada movimiento quita una palabra colocada y vuelve a colocarla, o coloca en
+    su lugar una de las no colocadas, en una posición con cruces si la hay; si
+    faltan palabras, también prueba a añadir una no colocada.
+    Un movimiento se acepta si no empeora la puntuación actual o la de hace
+    `history` iteraciones; si no, se deshace. Se queda la mejor colocación vista.
+    Las posiciones válidas de cada palabra se calculan de una vez sobre el tablero
+    en uint8 (tablas de lookfor_vectorized) y la puntuación se actualiza con
+    PuzzleScorer, así que cada movimiento cuesta O(segmentos) en NumPy más O(longitud).
+    Se detiene tras `iterations` movimientos, `time_budget` segundos o `deadline`.
+    Devuelve: (tablero relleno, lista_de_palabras_colocadas, ubicaciones)
+    """
+    start_all = time.perf_counter()
+    own_deadline = make_deadline(time_budget)
+    if deadline is None or (own_deadline is not None and own_deadline < deadline):
+        deadline = own_deadline
+
+    originals: Dict[str, str] = {}
+    for w in words:
+        originals.setdefault(w.upper(), w)
+    for p in locations:
+        originals.setdefault(p, p)
+
+    grid = np.zeros(rows*cols, dtype=np.uint8)
+    scorer = PuzzleScorer(rows, cols)
+    letters = {p: np.frombuffer(p.encode('latin-1'), dtype=np.uint8) for p in originals}
+
+    def cells_of(p: str, loc: Location) -> List[Tuple[int, int]]:
+        (r0, c0), _ = loc
+        df, dc = _direction(loc)
+        return [(r0 + df*k, c0 + dc*k) for k in range(len(p))]
+
+    def put(p: str, loc: Location) -> None:
+        for (r, c), ch in zip(cells_of(p, loc), p):
+            grid[r*cols + c] = ord(ch)
+        scorer.add(p, loc)
+
+    def take(p: str) -> Location:
+        loc = scorer.locations[p]
+        scorer.remove(p)
+        for r, c in cells_of(p, loc):
+            if (r, c) not in scorer.cell_usage:  # ninguna otra palabra pasa por aquí
+                grid[r*cols + c] = EMPTY
+        return loc
+
+    def spot(p: str) -> Location | None:
+        """Posición al azar para p, con cruces si las hay."""
+        cells, dir_idx, r0s, c0s = segment_arrays(rows, cols, len(p))
+        current = grid[cells]
+        same = current == letters[p]
+        ok = (same | (current == EMPTY)).all(axis=1)
+        options = np.flatnonzero(ok & same.any(axis=1))
+        if options.size == 0:
+            options = np.flatnonzero(ok)
+            if options.size == 0:
+                return None
+        i = int(options[random.randrange(options.size)])
+        df, dc = DIRECTIONS[int(dir_idx[i])]
+        r0, c0 = int(r0s[i]), int(c0s[i])
+        return (r0, c0), (r0 + df*(len(p)-1), c0 + dc*(len(p)-1))
+
+    # Tablero sin relleno a partir de las ubicaciones
+    for p, loc in locations.items():
+        put(p, loc)
+    placed = list(locations)
+    unplaced = [p for p in originals if p not in locations]
+
+    current = scorer.score()
+    best_score, best_locations = current, dict(scorer.locations)
+    recent = [current] * max(1, history)
+    tried = accepted = 0
+
+    for it in range(iterations):
+        if expired(deadline) or not (placed or unplaced):
+            break
+        tried += 1
+
+        # 1) Movimiento: lista de (palabra, ubicación anterior o None) para deshacerlo
+        undo: List[Tuple[str, Location | None]] = []
+        if unplaced and (not placed or (len(placed) < WORDS_PER_PUZZLE and random.random() < 0.5)):
+            x = random.choice(unplaced)
+            loc = spot(x)
+            if loc is not None:
+                put(x, loc)
+                undo.append((x, None))
+        else:
+            w = random.choice(placed)
+            undo.append((w, take(w)))
+            x = random.choice(unplaced) if unplaced and random.random() < 0.5 else w
+            loc = spot(x)
+            if loc is not None:
+                put(x, loc)
+                undo.append((x, None))
+            if x != w:
+                loc = spot(w)
+                if loc is not None:
+                    put(w, loc)
+                    undo.append((w, None))
+        if not undo:
+            continue
+
+        # 2) Aceptación tardía
+        new = scorer.score()
+        slot = it % len(recent)
+        if new >= current or new >= recent[slot]:
+            current = new
+            accepted += 1
+            placed = list(scorer.locations)
+            unplaced = [p for p in originals if p not in scorer.locations]
+            if current > best_score:
+                best_score, best_locations = current, dict(scorer.locations)
+        else:
+            for p, old in reversed(undo):
+                if old is None:
+                    take(p)
+                else:
+                    put(p, old)
+        recent[slot] = current
+
+    # 3) Mejor colocación vista, rellena
+    puzzle = [['' for _ in range(cols)] for _ in range(rows)]
+    for p, loc in best_locations.items():
+        (r0, c0), _ = loc
+        df, dc = _direction(loc)
+        place_word(p, puzzle, r0, c0, df, dc)
+    fill_empty_spaces(puzzle, rows, cols)
+
+    if VERBOSE:
+        total_time = time.perf_counter() - start_all
+        tqdm.write(f"[LOCAL] {tried} movimientos ({accepted} aceptados) en {total_time:.2f}s: "
+                   f"{len(locations)} → {len(best_locations)} palabras, "
+                   f"puntuación {PuzzleScorer(rows, cols, locations).score():.0f} → {best_score:.0f}.")
+
+    return puzzle, [originals[p] for p in best_locations], best_locations
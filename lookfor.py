@@ -2,23 +2,145 @@
 
 import random
 import time
+from collections import Counter
 from typing import List, Tuple, Dict
 from tqdm import tqdm
 
 from config import (
     WORDS_PER_PUZZLE,
     PUZZLE_ROWS, PUZZLE_COLUMNS,
-    DIRECTIONS, ALPHABET, VERBOSE
+    DIRECTIONS, ALPHABET, VERBOSE, LOOKFOR_INCREMENTAL
 )
+from geometry import segments, segment_at, indexed_segments
+from deadline import expired
+import metrics
+from word_placement import place_word, crossing_candidates, LetterIndex
+
+Candidate = Tuple[int, int, int, int, int]  # (cruces, r0, c0, df, dc)
+
+def _full_scan_best(
+    p: str, puzzle: List[List[str]], rows: int, cols: int,
+    dir_counts: Dict[Tuple[int,int], int], letter_index: LetterIndex
+) -> Candidate | None:
+    """Elige: más cruces, luego dirección menos usada.
+    Los candidatos con cruces salen del índice de letras; solo si no hay
+    ninguno se recorren todos los segmentos."""
+    candidates: List[Candidate] = crossing_candidates(p, puzzle, rows, cols, DIRECTIONS, letter_index)
+    if metrics.ENABLED:
+        metrics.count("candidates_scanned", len(candidates))
+    if not candidates:
+        segs = segments(rows, cols, len(p))
+        if metrics.ENABLED:
+            metrics.count("candidates_scanned", sum(len(s) for s in segs.values()))
+        for df, dc in DIRECTIONS:
+            for r0, c0, cells in segs[(df, dc)]:
+                match = 0
+                ok = True
+                for (r, c), ch in zip(cells, p):
+                    cur = puzzle[r][c]
+                    if cur == ch:
+                        match += 1
+                    elif cur != '':
+                        ok = False
+                        break
+
+                if ok:
+                    candidates.append((match, r0, c0, df, dc))
+
+    if not candidates:
+        return None
+    candidates.sort(key=lambda x: x[0], reverse=True)
+    max_match = candidates[0][0]
+    top = [c for c in candidates if c[0] == max_match]
+    top.sort(key=lambda x: dir_counts[(x[3], x[4])])
+    return top[0]
+
+def _new_length_state(puzzle: List[List[str]], rows: int, cols: int, L: int) -> dict:
+    """Estado incremental para palabras de longitud L: letras ya ocupadas en cada
+    segmento ('filled'), los segmentos que tienen la letra ch en su posición k
+    ('at'[(k, ch)]) y, por dirección, el primer segmento todavía vacío."""
+    segs, by_cell, spans = indexed_segments(rows, cols, L)
+    state = {
+        'segs': segs,
+        'by_cell': by_cell,
+        'spans': spans,
+        'filled': [0] * len(segs),
+        'at': {},
+        'cursor': {d: span.start for d, span in spans.items()},
+    }
+    occupied = [(r, c) for r in range(rows) for c in range(cols) if puzzle[r][c] != '']
+    _mark_filled({L: state}, puzzle, occupied)
+    return state
+
+def _incremental_best(
+    p: str, state: dict, dir_counts: Dict[Tuple[int,int], int]
+) -> Candidate | None:
+    """Misma elección que _full_scan_best sin recorrer el tablero: cada letra de
+    la palabra suma un cruce a los segmentos que tienen esa letra en esa posición,
+    y un segmento admite la palabra si todas sus letras son cruces. Los segmentos
+    vacíos solo cuentan si no hay ninguno con cruces."""
+    at, filled, segs = state['at'], state['filled'], state['segs']
+    crossings: Dict[int, int] = {}
+    for k, ch in enumerate(p):
+        for i in at.get((k, ch), ()):
+            crossings[i] = crossings.get(i, 0) + 1
+    if metrics.ENABLED:
+        metrics.count("candidates_scanned", len(crossings))
+    best = None
+    for i, match in crossings.items():
+        if match == filled[i]:
+            df, dc = segs[i][0], segs[i][1]
+            key = (-match, dir_counts[(df, dc)], i)
+            if best is None or key < best:
+                best = key
+
+    if best is None:
+        cursor = state['cursor']
+        for d, span in state['spans'].items():
+            i = cursor[d]
+            while i < span.stop and filled[i]:
+                i += 1
+            cursor[d] = i
+            if i < span.stop:
+                key = (0, dir_counts[d], i)
+                if best is None or key < best:
+                    best = key
+        if best is None:
+            return None
+
+    df, dc, r0, c0, _ = segs[best[2]]
+    return -best[0], r0, c0, df, dc
+
+def _mark_filled(states: Dict[int, dict], puzzle: List[List[str]], new_cells: List[Tuple[int,int]]) -> None:
+    """Actualiza solo los segmentos que pasan por las celdas recién ocupadas
+    (ya con su letra en `puzzle`)."""
+    for state in states.values():
+        by_cell, filled, at = state['by_cell'], state['filled'], state['at']
+        for r, c in new_cells:
+            ch = puzzle[r][c]
+            for i, k in by_cell.get((r, c), ()):
+                filled[i] += 1
+                key = (k, ch)
+                if key in at:
+                    at[key].append(i)  # cada celda se ocupa una sola vez: sin repetidos
+                else:
+                    at[key] = [i]
 
 def lookfor_sequential_word_search(
     words: List[str],
     rows: int = PUZZLE_ROWS,
-    cols: int = PUZZLE_COLUMNS
+    cols: int = PUZZLE_COLUMNS,
+    incremental: bool = LOOKFOR_INCREMENTAL,
+    deadline: float | None = None
 ) -> Tuple[List[List[str]], List[str], Dict[str, Tuple[Tuple[int,int],Tuple[int,int]]]]:
     """
     Coloca secuencialmente WORDS_PER_PUZZLE palabras, tratando de maximizar cruces
     y equilibrar el uso de direcciones.
+    Con `incremental`, mantiene por longitud qué segmentos tienen cada letra en
+    cada posición y solo actualiza los que cruzan cada palabra colocada (mismo
+    resultado); elegir sitio cuesta lo que suman esos segmentos para las letras
+    de la palabra, no el tamaño del tablero.
+    Si vence `deadline` (time.perf_counter), se detiene con lo ya colocado.
     Devuelve: (tablero, lista_de_palabras_colocadas, ubicaciones)
     """
     start_all = time.perf_counter()
@@ -30,6 +152,9 @@ def lookfor_sequential_word_search(
 
     # 2) Conteo de uso de cada dirección
     dir_counts = {d: 0 for d in DIRECTIONS}
+    states: Dict[int, dict] = {}  # modo incremental: estado por longitud de palabra
+    pending = Counter(len(w) for w in words)  # palabras por probar de cada longitud
+    letter_index: LetterIndex = {}  # letra -> celdas ocupadas
 
     if VERBOSE:
        tqdm.write(f"\n[LOOKFOR] Generando sopa secuencial ({rows}×{cols}), "
@@ -39,56 +164,41 @@ def lookfor_sequential_word_search(
     for word in words:
         if placed >= WORDS_PER_PUZZLE:
             break
+        if expired(deadline):
+            if VERBOSE:
+               tqdm.write(" [LOOKFOR] Tiempo agotado.")
+            break
 
         p = word.upper()
         L = len(p)
-        candidates: List[Tuple[int,int,int,int,int]] = []
 
-        # 3) Explorar todas las posiciones posibles
-        for df, dc in DIRECTIONS:
-            for r0 in range(rows):
-                for c0 in range(cols):
-                    rf = r0 + df*(L-1)
-                    cf = c0 + dc*(L-1)
-                    if not (0 <= rf < rows and 0 <= cf < cols):
-                        continue
-
-                    match = 0
-                    ok = True
-                    r, c = r0, c0
-                    for ch in p:
-                        if puzzle[r][c] == ch:
-                            match += 1
-                        elif puzzle[r][c] != '':
-                            ok = False
-                            break
-                        r += df; c += dc
-
-                    if ok:
-                        candidates.append((match, r0, c0, df, dc))
-
-        if not candidates:
+        # 3) Mejor posición: más cruces, luego dirección menos usada
+        if incremental:
+            if L not in states:
+                states[L] = _new_length_state(puzzle, rows, cols, L)
+            best = _incremental_best(p, states[L], dir_counts)
+            pending[L] -= 1
+            if not pending[L]:  # no quedan palabras de esta longitud: deja de mantenerla
+                del states[L]
+        else:
+            best = _full_scan_best(p, puzzle, rows, cols, dir_counts, letter_index)
+
+        if best is None:
             if VERBOSE:
                tqdm.write(f" [SKIP] '{word}' no cabe en ningún lugar.")
+            if metrics.ENABLED:
+                metrics.count("words_skipped")
             continue
 
-        # 4) Filtrar: primero por más cruces, luego por dirección menos usada
-        candidates.sort(key=lambda x: x[0], reverse=True)
-        max_match = candidates[0][0]
-        top = [c for c in candidates if c[0] == max_match]
-        top.sort(key=lambda x: dir_counts[(x[3], x[4])])
-
-        match, r0, c0, df, dc = top[0]
-        rf = r0 + df*(L-1)
-        cf = c0 + dc*(L-1)
-
-        # 5) Colocar la palabra
-        r, c = r0, c0
-        for ch in p:
-            puzzle[r][c] = ch
-            r += df; c += dc
+        match, r0, c0, df, dc = best
 
-        locations[p] = ((r0, c0), (rf, cf))
+        # 4) Colocar la palabra
+        if incremental:
+            cells = segment_at(rows, cols, L, (df, dc), r0, c0)[2]
+            new_cells = [(r, c) for r, c in cells if puzzle[r][c] == '']
+        locations[p] = place_word(p, puzzle, r0, c0, df, dc, letter_index)
+        if incremental:
+            _mark_filled(states, puzzle, new_cells)
         dir_counts[(df, dc)] += 1
         placed += 1
         placed_words.append(word)
@@ -97,7 +207,7 @@ def lookfor_sequential_word_search(
            tqdm.write(f" [{placed}/{WORDS_PER_PUZZLE}] Colocado '{word}' "
                   f"en {(r0,c0)} dir {(df,dc)} cruces={match}.")
 
-    # 6) Rellenar espacios vacíos
+    # 5) Rellenar espacios vacíos
     for i in range(rows):
         for j in range(cols):
             if puzzle[i][j] == '':
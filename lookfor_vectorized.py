@@ -0,0 +1,109 @@
+# lookfor_vectorized.py
+
+import random
+import time
+from typing import List, Tuple, Dict
+
+import numpy as np
+from tqdm import tqdm
+
+from config import (
+    WORDS_PER_PUZZLE,
+    PUZZLE_ROWS, PUZZLE_COLUMNS,
+    DIRECTIONS, ALPHABET, VERBOSE
+)
+from geometry import segment_arrays, EMPTY
+from deadline import expired
+import metrics
+
+def lookfor_vectorized_word_search(
+    words: List[str],
+    rows: int = PUZZLE_ROWS,
+    cols: int = PUZZLE_COLUMNS,
+    deadline: float | None = None
+) -> Tuple[List[List[str]], List[str], Dict[str, Tuple[Tuple[int,int],Tuple[int,int]]]]:
+    """
+    Variante de lookfor_sequential_word_search con la matriz en un array uint8:
+    los cruces y conflictos de todas las (posición, dirección) se calculan a la vez.
+    Misma regla de selección (más cruces, luego dirección menos usada) y mismo resultado.
+    Si vence `deadline` (time.perf_counter), se detiene con lo ya colocado.
+    Devuelve: (tablero, lista_de_palabras_colocadas, ubicaciones)
+    """
+    start_all = time.perf_counter()
+
+    grid = np.zeros(rows*cols, dtype=np.uint8)
+    locations: Dict[str, Tuple[Tuple[int,int],Tuple[int,int]]] = {}
+    placed_words: List[str] = []
+    dir_counts = np.zeros(len(DIRECTIONS), dtype=np.int64)
+
+    if VERBOSE:
+       tqdm.write(f"\n[LOOKFOR-NP] Generando sopa secuencial ({rows}×{cols}), "
+              f"{len(words)} candidatas, colocando {WORDS_PER_PUZZLE}...\n")
+
+    placed = 0
+    for word in words:
+        if placed >= WORDS_PER_PUZZLE:
+            break
+        if expired(deadline):
+            if VERBOSE:
+               tqdm.write(" [LOOKFOR-NP] Tiempo agotado.")
+            break
+
+        p = word.upper()
+        L = len(p)
+        letters = np.frombuffer(p.encode('latin-1'), dtype=np.uint8)
+        cells, dir_idx, r0s, c0s = segment_arrays(rows, cols, L)
+        if metrics.ENABLED:
+            metrics.count("candidates_scanned", len(cells))
+
+        # 1) Cruces y conflictos de todos los segmentos a la vez
+        current = grid[cells]
+        match = (current == letters).sum(axis=1)
+        ok = ~((current != EMPTY) & (current != letters)).any(axis=1)
+
+        if not ok.any():
+            if VERBOSE:
+               tqdm.write(f" [SKIP] '{word}' no cabe en ningún lugar.")
+            if metrics.ENABLED:
+                metrics.count("words_skipped")
+            continue
+
+        # 2) Más cruces; a igualdad, dirección menos usada; a igualdad, el primero
+        match = np.where(ok, match, -1)
+        best = match == match.max()
+        usage = np.where(best, dir_counts[dir_idx], np.iinfo(np.int64).max)
+        i = int(np.argmin(usage))
+
+        k = int(dir_idx[i])
+        df, dc = DIRECTIONS[k]
+        r0, c0 = int(r0s[i]), int(c0s[i])
+        rf = r0 + df*(L-1)
+        cf = c0 + dc*(L-1)
+
+        # 3) Colocar la palabra
+        grid[cells[i]] = letters
+        locations[p] = ((r0, c0), (rf, cf))
+        dir_counts[k] += 1
+        placed += 1
+        placed_words.append(word)
+
+        if VERBOSE:
+           tqdm.write(f" [{placed}/{WORDS_PER_PUZZLE}] Colocado '{word}' "
+                  f"en {(r0,c0)} dir {(df,dc)} cruces={int(match[i])}.")
+
+    # 4) Volver a lista de listas y rellenar espacios vacíos
+    flat = grid.tolist()
+    puzzle = [[chr(v) if v != EMPTY else '' for v in flat[i*cols:(i+1)*cols]] for i in range(rows)]
+    for i in range(rows):
+        for j in range(cols):
+            if puzzle[i][j] == '':
+                puzzle[i][j] = random.choice(ALPHABET)
+
+    if VERBOSE:
+        total_time = time.perf_counter() - start_all
+        tqdm.write(f"\n[LOOKFOR-NP] Colocadas {placed}/{WORDS_PER_PUZZLE} palabras " f"en {total_time:.2f}s.")
+        tqdm.write(" [LOOKFOR-NP] Uso de direcciones:")
+        for d, cnt in zip(DIRECTIONS, dir_counts.tolist()):
+            tqdm.write(f"   {d}: {cnt}")
+
+    return puzzle, placed_words, locations
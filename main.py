@@ -5,6 +5,8 @@ main.py: Orchestrates the generation of word‐search puzzles and exports to DOC
 
 import random
 import os
+from functools import partial
+from multiprocessing import Pool
 from tqdm import tqdm
 
 from config import (
@@ -16,18 +18,156 @@ from config import (
     PUZZLE_ROWS,
     PUZZLE_COLUMNS,
     USE_LOOKFOR,
+    USE_VECTORIZED,
+    USE_BEAM,
+    BEAM_WIDTH,
+    BEAM_BRANCHING,
+    USE_LOCAL_SEARCH,
+    LOCAL_SEARCH_ITERATIONS,
+    LOCAL_SEARCH_HISTORY,
+    LOCAL_SEARCH_TIME_BUDGET,
+    ALPHABET,
+    DIRECTIONS,
+    GENERATION_WORKERS,
+    GENERATION_SEED,
+    USE_BACKTRACKING,
+    BACKTRACK_MAX_NODES,
+    BACKTRACK_NODES_PER_WORD,
+    BACKTRACK_SPARE_WORDS,
+    PUZZLE_RETRIES,
+    PUZZLE_TIME_BUDGET,
+    PORTFOLIO_ATTEMPTS,
+    PORTFOLIO_TARGET_SCORE,
+    INSTRUMENTATION_REPORT,
+    PUZZLE_STORE,
+    PUZZLE_STORE_RESUME,
+    PUZZLE_STORE_REUSE,
 )
-from data_loader import get_raw_words, load_blacklist
-from generator import build_filtered_dict, generate_word_search
-from export_docx import create_docx
+from data_loader import load_blacklist
+from dict_cache import dict_cache_key
+from generator import load_filtered_dict, generate_seeded_word_search
+from portfolio import portfolio_word_search
+from puzzle_store import PuzzleStore, run_fingerprint
+import metrics
+
+
+def selection_size() -> int:
+    """Words per selection; the backtracking solver also gets a few spare words to swap in."""
+    return WORDS_PER_PUZZLE + (BACKTRACK_SPARE_WORDS if USE_BACKTRACKING else 0)
+
+
+def plan_puzzles(filtered: list[str], total: int, seed: int) -> list[tuple[list[str], int]]:
+    """Decide up front the word selection and seed of every puzzle.
+    The same (dictionary, seed) always yields the same plan."""
+    rng = random.Random(seed)
+    size = selection_size()
+    jobs = []
+    used = set()
+    for _ in range(total):
+        # ensure enough fresh words
+        avail = [w for w in filtered if w.upper() not in used]
+        if len(avail) < size:
+            used.clear()
+            avail = filtered.copy()
+
+        selection = rng.sample(avail, min(size, len(avail)))
+        used.update(w.upper() for w in selection)
+        jobs.append((selection, rng.getrandbits(64)))
+    return jobs
+
+
+def run_settings() -> dict:
+    """Everything that decides which puzzles a run produces, besides the seed
+    (the store keeps that one apart): a store is only resumed under the same settings."""
+    return {
+        "dictionary": dict_cache_key(),
+        "board": [PUZZLE_ROWS, PUZZLE_COLUMNS],
+        "alphabet": ALPHABET,
+        "directions": DIRECTIONS,
+        "words_per_puzzle": WORDS_PER_PUZZLE,
+        "total_puzzles": TOTAL_PUZZLES,
+        "engine": {
+            "lookfor": USE_LOOKFOR, "vectorized": USE_VECTORIZED, "beam": USE_BEAM,
+            "beam_search": [BEAM_WIDTH, BEAM_BRANCHING],
+            "local_search": USE_LOCAL_SEARCH, "backtracking": USE_BACKTRACKING,
+            "local_search_limits": [LOCAL_SEARCH_ITERATIONS, LOCAL_SEARCH_HISTORY, LOCAL_SEARCH_TIME_BUDGET],
+            "backtrack_nodes": [BACKTRACK_MAX_NODES, BACKTRACK_NODES_PER_WORD],
+            "spare_words": BACKTRACK_SPARE_WORDS,
+            "portfolio": [PORTFOLIO_ATTEMPTS, PORTFOLIO_TARGET_SCORE],
+            "retries": PUZZLE_RETRIES, "time_budget": PUZZLE_TIME_BUDGET,
+        },
+    }
+
+
+def puzzle_generator():
+    """generate_seeded_word_search with the book's board and engine settings."""
+    return partial(generate_seeded_word_search,
+                   rows=PUZZLE_ROWS, columns=PUZZLE_COLUMNS, use_lookfor=USE_LOOKFOR,
+                   use_backtracking=USE_BACKTRACKING)
+
+
+_retry_words: list[str] = []  # filtered dictionary the retries sample from (set in every worker)
+
+
+def _set_retry_words(filtered: list[str]) -> None:
+    global _retry_words
+    _retry_words = filtered
+
+
+def generate_with_retries(generate, job: tuple[list[str], int]) -> tuple:
+    """Run generate(job) and, if the puzzle fell short (out of time, or a selection
+    the solver proved can't fit), retry up to PUZZLE_RETRIES times, each with a fresh
+    word sample drawn with the job's seed and the same `generate` (the portfolio,
+    in portfolio mode). Runs inside the worker, so retries stay parallel.
+    Returns (puzzle, placed_words, locations, retries, timed_out): the result with
+    most words, how many retries ran and whether any attempt hit the time budget."""
+    puzzle, placed_words, locations, status = generate(job)
+    best = (puzzle, placed_words, locations)
+    timed_out = status == "timeout"
+    rng = random.Random(job[1])
+    retries = 0
+    while status and len(locations) < WORDS_PER_PUZZLE and retries < PUZZLE_RETRIES:
+        retries += 1
+        selection = rng.sample(_retry_words, min(selection_size(), len(_retry_words)))
+        puzzle, placed_words, locations, status = generate((selection, rng.getrandbits(64)))
+        timed_out = timed_out or status == "timeout"
+        if len(locations) > len(best[2]):
+            best = (puzzle, placed_words, locations)
+    return (*best, retries, timed_out)
+
+
+def generate_puzzles(jobs: list[tuple[list[str], int]], filtered: list[str],
+                     workers: int = GENERATION_WORKERS):
+    """Yield generate_with_retries results in job order, using `workers` processes.
+    In portfolio mode the processes share the attempts of one puzzle instead."""
+    _set_retry_words(filtered)
+    if PORTFOLIO_ATTEMPTS > 1:
+        if workers <= 1:
+            yield from (generate_with_retries(portfolio_word_search, job) for job in jobs)
+            return
+        with Pool(workers) as pool:
+            portfolio = partial(portfolio_word_search, pool=pool, workers=workers)
+            yield from (generate_with_retries(portfolio, job) for job in jobs)
+        return
+
+    generate = partial(generate_with_retries, puzzle_generator())
+    if workers <= 1:
+        yield from map(generate, jobs)
+        return
+    with Pool(workers, initializer=_set_retry_words, initargs=(filtered,)) as pool:
+        if not metrics.ENABLED:
+            yield from pool.imap(generate, jobs)
+            return
+        # the workers' counters come back with each puzzle
+        for result, data in pool.imap(partial(metrics.collect, generate), jobs):
+            metrics.merge(data)
+            yield result
 
 
 def main():
-    # 1) Load & filter
-    raw = get_raw_words()
-    tqdm.write(f"🔍 Retrieved {len(raw)} raw words.")
+    # 1) Load & filter (cached on disk, see dict_cache.py)
     blacklist = load_blacklist()
-    filtered = build_filtered_dict(raw, blacklist)
+    filtered = load_filtered_dict(blacklist)
     tqdm.write(f"✅ Filtered dictionary: {len(filtered)} words.\n")
 
     # 2) Dump filtered list for inspection
@@ -37,50 +177,77 @@ def main():
             f.write(w + "\n")
     tqdm.write(f"📝 Filtered dictionary saved to '{out_file}'.\n")
 
-    # 3) Generate puzzles
+    # 3) Generate puzzles (each one seeded, so puzzle N doesn't depend on the worker count)
+    seed = GENERATION_SEED if GENERATION_SEED is not None else random.randrange(2**32)
     all_puzzles = []
-    used = set()
-    for _ in tqdm(range(TOTAL_PUZZLES),
-                  desc="Generating puzzles",
-                  unit="puzzle",
-                  ncols=TQDM_COLS):
-        # ensure enough fresh words
-        avail = [w for w in filtered if w.upper() not in used]
-        if len(avail) < WORDS_PER_PUZZLE:
-            used.clear()
-            avail = filtered.copy()
+    store = None
+    if PUZZLE_STORE:
+        # every finished puzzle goes to disk; an interrupted run with the same settings
+        # picks up from there (a complete book only with PUZZLE_STORE_REUSE)
+        store = PuzzleStore(PUZZLE_STORE)
+        stored = store.open(seed, run_fingerprint(run_settings()), resume=PUZZLE_STORE_RESUME,
+                            keep_seed=GENERATION_SEED is None,
+                            complete=None if PUZZLE_STORE_REUSE else TOTAL_PUZZLES)
+        if store.discarded == "fingerprint":
+            tqdm.write(f"🗑️  '{store.data_path}' was generated with other settings; starting a new store.")
+        elif store.discarded == "seed":
+            tqdm.write(f"🗑️  '{store.data_path}' was generated with another seed; starting a new store.")
+        elif store.discarded == "complete":
+            tqdm.write(f"🗑️  '{store.data_path}' already holds a complete book; generating it again "
+                       f"(set PUZZLE_STORE_REUSE to export the stored one).")
+        if stored:
+            all_puzzles = list(store)
+            tqdm.write(f"♻️  Resuming: {stored} puzzles already in '{store.data_path}'.")
+        seed = store.seed
+    tqdm.write(f"🎲 Book seed: {seed}")
+    jobs = plan_puzzles(filtered, TOTAL_PUZZLES, seed)
+    done = len(all_puzzles)
+    timed_out = []  # puzzles that hit PUZZLE_TIME_BUDGET: they may differ between runs
 
-        selection = random.sample(avail, WORDS_PER_PUZZLE)
-        used.update(w.upper() for w in selection)
-
-        # call generator with algorithm flags
-        result = generate_word_search(
-            selection,
-            rows=PUZZLE_ROWS,
-            columns=PUZZLE_COLUMNS,
-            use_lookfor=USE_LOOKFOR
-        )
+    with metrics.stage("generation"):
+        for idx, result in enumerate(tqdm(generate_puzzles(jobs[done:], filtered),
+                                          total=len(jobs),
+                                          initial=done,
+                                          desc="Generating puzzles",
+                                          unit="puzzle",
+                                          ncols=TQDM_COLS), start=done + 1):
+            puzzle, placed_words, locations, retries, hit_budget = result
+            if retries:
+                metrics.count("puzzles_retried")
+                tqdm.write(f"🔁 Puzzle {idx} fell short and was retried with new words {retries} time(s).")
+            if hit_budget:
+                metrics.count("puzzles_timed_out")
+                timed_out.append(idx)
+                tqdm.write(f"⏱️  Puzzle {idx} hit the {PUZZLE_TIME_BUDGET}s time budget; it may differ between runs.")
 
-        # flexible unpacking: (pzl, locs) or (pzl, words_placed, locs)
-        if len(result) == 3:
-            puzzle, placed_words, locations = result
-        else:
-            puzzle, locations = result
-            placed_words = list(locations.keys())
+            # warn if didn’t reach the target
+            if len(placed_words) < WORDS_PER_PUZZLE:
+                metrics.count("puzzles_below_target")
+                tqdm.write(f"⚠️  Only placed {len(placed_words)}/{WORDS_PER_PUZZLE} words in puzzle {idx}.")
 
-        # warn if didn’t reach the target
-        if len(placed_words) < WORDS_PER_PUZZLE:
-            tqdm.write(f"⚠️  Only placed {len(placed_words)}/{WORDS_PER_PUZZLE} words in this puzzle.")
-
-        all_puzzles.append((puzzle, placed_words, locations))
+            all_puzzles.append((puzzle, placed_words, locations))
+            if store is not None:
+                store.append(puzzle, placed_words, locations)
+    if store is not None:
+        store.close()
 
+    if timed_out:
+        tqdm.write(f"\n⏱️  {len(timed_out)} puzzle(s) hit the {PUZZLE_TIME_BUDGET}s time budget "
+                   f"and are not reproducible from the seed: {', '.join(map(str, timed_out))}")
     tqdm.write("\n🎯 Puzzle generation complete.\n")
 
     # 4) Export
     tqdm.write("📄 Creating DOCX…")
-    create_docx(all_puzzles)
+    from export_docx import create_docx  # python-docx/matplotlib solo en la exportación
+    with metrics.stage("docx", exclude=("render", "pdf")):
+        create_docx(all_puzzles)
     # La creación de PDF ahora se maneja dentro de create_docx
     # No es necesaria una llamada separada a create_pdf.
+
+    # 5) Stage timings and counters
+    if metrics.ENABLED:
+        json_path, csv_path = metrics.write_report(INSTRUMENTATION_REPORT)
+        tqdm.write(f"📊 Run report saved to '{json_path}' and '{csv_path}'.")
     tqdm.write("🏁 All done!")
 
 
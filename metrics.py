@@ -0,0 +1,100 @@
+# metrics.py
+
+import csv
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterable, Iterator
+
+from config import INSTRUMENTATION
+
+# Los motores comprueban ENABLED antes de contar, una vez por palabra y nunca
+# dentro de los bucles de posiciones, así que desactivado no cuesta nada.
+ENABLED = INSTRUMENTATION
+
+_timings: defaultdict[str, float] = defaultdict(float)
+_counters: Counter = Counter()
+_NULL = nullcontext()
+
+
+def count(name: str, n: int = 1) -> None:
+    """Suma `n` al contador `name`."""
+    _counters[name] += n
+
+
+@contextmanager
+def _timed(name: str, exclude: tuple[str, ...]):
+    before = sum(_timings[e] for e in exclude)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        nested = sum(_timings[e] for e in exclude) - before
+        _timings[name] += time.perf_counter() - start - nested
+
+
+def stage(name: str, exclude: str | tuple[str, ...] = ()):
+    """Cronometra una etapa (acumulativo). Con `exclude`, descuenta el tiempo que
+    esas otras etapas acumulen mientras tanto."""
+    if isinstance(exclude, str):
+        exclude = (exclude,)
+    return _timed(name, exclude) if ENABLED else _NULL
+
+
+def timed_iter(name: str, items: Iterable) -> Iterable:
+    """Cuenta en la etapa `name` el tiempo que pasa dentro del iterador."""
+    if not ENABLED:
+        return items
+    return _timed_iter(name, iter(items))
+
+
+def _timed_iter(name: str, it: Iterator) -> Iterator:
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            _timings[name] += time.perf_counter() - start
+            return
+        _timings[name] += time.perf_counter() - start
+        yield item
+
+
+def snapshot(reset: bool = False) -> dict:
+    """Tiempos y contadores actuales (para enviarlos desde otro proceso)."""
+    data = {"timings": dict(_timings), "counters": dict(_counters)}
+    if reset:
+        _timings.clear()
+        _counters.clear()
+    return data
+
+
+def merge(data: dict) -> None:
+    """Suma los tiempos y contadores de un snapshot."""
+    for name, value in data["timings"].items():
+        _timings[name] += value
+    _counters.update(data["counters"])
+
+
+def collect(fn: Callable, *args):
+    """Ejecuta fn(*args) en un proceso de trabajo y devuelve (resultado, snapshot)."""
+    snapshot(reset=True)
+    result = fn(*args)
+    return result, snapshot(reset=True)
+
+
+def write_report(base: str) -> tuple[str, str]:
+    """Escribe `base`.json y `base`.csv (tipo, nombre, valor). Devuelve las rutas."""
+    data = snapshot()
+    json_path, csv_path = f"{base}.json", f"{base}.csv"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["kind", "name", "value"])
+        for name, value in sorted(data["timings"].items()):
+            writer.writerow(["seconds", name, f"{value:.6f}"])
+        for name, value in sorted(data["counters"].items()):
+            writer.writerow(["count", name, value])
+    return json_path, csv_path
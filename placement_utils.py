@@ -1,98 +1,83 @@
 # placement_utils.py
+import math
 import random
-from config import DIRECTIONS, MAX_FALLBACK_TRIES
-from word_placement import place_word
+from config import DIRECTIONS
+from word_placement import place_word, feasible_placements
+import metrics
+
+def _truncated_gauss_weights(n: int, center: int, sigma: int) -> list[float]:
+    """Probabilidad de cada índice 0..n-1 para max(0, min(n-1, center + int(gauss(0, sigma)))).
+    int() trunca hacia cero, así que int(X) <= m equivale a X <= m si m < 0 y a X < m+1 si m >= 0."""
+    if sigma <= 0:
+        weights = [0.0] * n
+        weights[max(0, min(n-1, center))] = 1.0
+        return weights
+
+    def cdf(m: int) -> float:  # P(int(X) <= m)
+        x = m if m < 0 else m + 1
+        return 0.5 * (1.0 + math.erf(x / (sigma * math.sqrt(2.0))))
+
+    weights = [cdf(i - center) - cdf(i - center - 1) for i in range(n)]
+    weights[0] = cdf(-center)
+    weights[-1] = 1.0 - cdf(n - 2 - center) if n > 1 else 1.0
+    return weights
 
 def _try_primary_placement(
     word_upper: str, puzzle: list[list[str]], rows: int, columns: int,
     locations: dict, dir_counts: dict, sorted_directions: list[tuple[int,int]],
-    is_short_word: bool, primary_tries: int
+    is_short_word: bool, feasible: list[tuple[int,int,int,int]]
 ) -> bool:
-    """Intenta la colocación primaria (estratégica)."""
-    for _ in range(primary_tries):
-        df, dc = sorted_directions[min(random.randint(0, len(sorted_directions)-1),
-                                      random.randint(0, len(sorted_directions)-1))]
-        
-        if is_short_word:
-            center_r, center_c = rows//2, columns//2
-            r_offset = int(random.gauss(0, rows//4))
-            c_offset = int(random.gauss(0, columns//4))
-            r0 = max(0, min(rows-1, center_r + r_offset))
-            c0 = max(0, min(columns-1, center_c + c_offset))
-        else:
-            r0, c0 = random.randrange(rows), random.randrange(columns)
-            
-        rf = r0 + df*(len(word_upper)-1)
-        cf = c0 + dc*(len(word_upper)-1)
-        
-        if not (0 <= rf < rows and 0 <= cf < columns):
-            continue
-            
-        ok = True
-        r, c = r0, c0
-        for l_char in word_upper:
-            if puzzle[r][c] not in ('', l_char):
-                ok = False
-                break
-            r += df; c += dc
-            
-        if ok:
-            loc = place_word(word_upper, puzzle, r0, c0, df, dc)
-            locations[word_upper] = loc
-            dir_counts[(df, dc)] = dir_counts.get((df,dc), 0) + 1
-            return True
-    return False
+    """Intenta la colocación primaria (estratégica).
+    Sortea entre las posiciones donde la palabra cabe con el mismo sesgo que el
+    antiguo muestreo con rechazo: direcciones menos usadas (mínimo de dos índices
+    al azar) y, para palabras cortas, inicio gaussiano alrededor del centro."""
+    n = len(sorted_directions)
+    dir_weight = {d: (2*(n-k) - 1) / (n*n) for k, d in enumerate(sorted_directions)}
+    if is_short_word:
+        row_w = _truncated_gauss_weights(rows, rows//2, rows//4)
+        col_w = _truncated_gauss_weights(columns, columns//2, columns//4)
+        weights = [dir_weight.get((df, dc), 0.0) * row_w[r0] * col_w[c0] for r0, c0, df, dc in feasible]
+    else:
+        weights = [dir_weight.get((df, dc), 0.0) for _, _, df, dc in feasible]
+    if not any(weights):
+        return False
+
+    r0, c0, df, dc = random.choices(feasible, weights=weights)[0]
+    loc = place_word(word_upper, puzzle, r0, c0, df, dc)
+    locations[word_upper] = loc
+    dir_counts[(df, dc)] = dir_counts.get((df,dc), 0) + 1
+    return True
 
 def _try_secondary_placement(
     word_upper: str, puzzle: list[list[str]], rows: int, columns: int,
-    locations: dict, dir_counts: dict, secondary_tries: int
+    locations: dict, dir_counts: dict, feasible: list[tuple[int,int,int,int]]
 ) -> bool:
     """Intenta la colocación secundaria (completamente aleatoria)."""
-    for _ in range(secondary_tries):
-        df, dc = random.choice(DIRECTIONS)
-        r0, c0 = random.randrange(rows), random.randrange(columns)
-        rf = r0 + df*(len(word_upper)-1)
-        cf = c0 + dc*(len(word_upper)-1)
-        
-        if not (0 <= rf < rows and 0 <= cf < columns):
-            continue
-            
-        ok = True
-        r, c = r0, c0
-        for l_char in word_upper:
-            if puzzle[r][c] not in ('', l_char):
-                ok = False
-                break
-            r += df; c += dc
-            
-        if ok:
-            loc = place_word(word_upper, puzzle, r0, c0, df, dc)
-            locations[word_upper] = loc
-            dir_counts[(df, dc)] = dir_counts.get((df,dc), 0) + 1
-            return True
-    return False
+    if not feasible:
+        return False
+    r0, c0, df, dc = random.choice(feasible)
+    loc = place_word(word_upper, puzzle, r0, c0, df, dc)
+    locations[word_upper] = loc
+    dir_counts[(df, dc)] = dir_counts.get((df,dc), 0) + 1
+    return True
 
 def try_random_placement(word: str, puzzle: list[list[str]], rows: int, columns: int, 
-                        locations: dict, dir_counts: dict, max_tries: int = None) -> bool:
+                        locations: dict, dir_counts: dict) -> bool:
     """Try to place a word in a random position.
+    Samples directly from the placements where the word fits, so a word that
+    does not fit fails at once.
     Returns True if successful, False otherwise."""
-    max_tries = max_tries or MAX_FALLBACK_TRIES
     p = word.upper()
+    if metrics.ENABLED:
+        metrics.count("fallback_probes")
+    feasible = feasible_placements(p, puzzle, rows, columns, DIRECTIONS)
+    if not feasible:
+        return False
     
     is_short_word = len(p) <= 5
     sorted_directions = sorted(DIRECTIONS, key=lambda d: dir_counts.get(d, 0))
     
-    primary_tries_ratio = 0.7
-    if is_short_word:
-        primary_tries_ratio = 0.8
-
-    primary_tries = int(max_tries * primary_tries_ratio)
-    secondary_tries = max_tries - primary_tries
-    
-    if _try_primary_placement(p, puzzle, rows, columns, locations, dir_counts, sorted_directions, is_short_word, primary_tries):
-        return True
-    
-    if _try_secondary_placement(p, puzzle, rows, columns, locations, dir_counts, secondary_tries):
+    if _try_primary_placement(p, puzzle, rows, columns, locations, dir_counts, sorted_directions, is_short_word, feasible):
         return True
     
-    return False
\ No newline at end of file
+    return _try_secondary_placement(p, puzzle, rows, columns, locations, dir_counts, feasible)
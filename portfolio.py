@@ -0,0 +1,111 @@
+# portfolio.py
+
+import random
+from functools import partial
+from multiprocessing.pool import Pool
+from tqdm import tqdm
+
+from config import (
+    PUZZLE_ROWS, PUZZLE_COLUMNS, VERBOSE,
+    PORTFOLIO_ATTEMPTS, PORTFOLIO_TARGET_SCORE, PUZZLE_TIME_BUDGET, GENERATION_WORKERS
+)
+from deadline import make_deadline, expired
+from evaluation import evaluate_puzzle
+from generator import generate_word_search
+import metrics
+
+Attempt = tuple[list[str], int, str, bool]  # (palabras, semilla, motor, mezclar orden)
+
+# Todos los interruptores de generate_word_search para cada motor, explícitos para
+# que el motor que se informa sea el que se ejecuta, sea cual sea config.py
+ENGINE_FLAGS = {
+    "lookfor": dict(use_lookfor=True, use_vectorized=False, use_beam=False,
+                    use_local_search=False, use_backtracking=False),
+    "greedy": dict(use_lookfor=False, use_vectorized=False, use_beam=False,
+                   use_local_search=False, use_backtracking=False),
+}
+
+
+def plan_attempts(selection: list[str], seed: int, attempts: int) -> list[Attempt]:
+    """Intentos de un puzzle: lookfor y greedy tal cual, y después variantes
+    sembradas que alternan motor y mezclan el orden de las palabras (a igual
+    longitud, porque los motores las ordenan de más larga a más corta).
+    En greedy la semilla también cambia el orden de las direcciones."""
+    rng = random.Random(seed)
+    plan = []
+    for i in range(attempts):
+        engine = "lookfor" if i % 2 == 0 else "greedy"
+        plan.append((selection, seed if i < 2 else rng.getrandbits(64), engine, i >= 2))
+    return plan
+
+
+def run_attempt(
+    attempt: Attempt,
+    rows: int = PUZZLE_ROWS,
+    columns: int = PUZZLE_COLUMNS,
+    time_budget: float | None = PUZZLE_TIME_BUDGET
+) -> tuple[float, list[list[str]], list[str], dict, str | None]:
+    """Ejecuta un intento y lo puntúa con evaluate_puzzle.
+    Devuelve (puntuación, tablero, palabras colocadas, ubicaciones, estado);
+    el estado es "timeout" si venció el plazo y None si no."""
+    selection, seed, engine, shuffle = attempt
+    random.seed(seed)
+    words = list(selection)
+    if shuffle:
+        random.shuffle(words)
+    deadline = make_deadline(time_budget)
+    puzzle, placed, locations = generate_word_search(words, rows, columns, deadline=deadline,
+                                                     **ENGINE_FLAGS[engine])
+    status = "timeout" if expired(deadline) else None
+    return evaluate_puzzle(puzzle, locations, len(locations)), puzzle, placed, locations, status
+
+
+def portfolio_word_search(
+    job: tuple[list[str], int],
+    pool: Pool | None = None,
+    workers: int = GENERATION_WORKERS,
+    attempts: int = PORTFOLIO_ATTEMPTS,
+    target_score: float | None = PORTFOLIO_TARGET_SCORE,
+    time_budget: float | None = PUZZLE_TIME_BUDGET
+) -> tuple[list[list[str]], list[str], dict[str, tuple[tuple[int, int], tuple[int, int]]], str | None]:
+    """
+    Genera `attempts` versiones de un puzzle y se queda con la de mayor evaluate_puzzle.
+    Con `pool`, los intentos se lanzan en tandas de `workers`; se deja de
+    lanzar tandas al alcanzar `target_score` o al vencer `time_budget`.
+    El elegido es el primer intento (en orden) que alcanza el objetivo o, si
+    ninguno lo hace, el de mayor puntuación, así que no depende del número de procesos.
+    Devuelve: (tablero, palabras colocadas, ubicaciones, estado); el estado es
+    "timeout" si venció el plazo de algún intento o del puzzle (dejando tandas sin lanzar)
+    """
+    selection, seed = job
+    plan = plan_attempts(selection, seed, max(1, attempts))
+    deadline = make_deadline(time_budget)
+    wave = max(1, workers) if pool is not None else 1
+
+    results = []
+    for start in range(0, len(plan), wave):
+        batch = plan[start:start + wave]
+        if pool is None:
+            results.extend(map(run_attempt, batch))
+        elif metrics.ENABLED:  # los contadores de cada proceso vuelven con el resultado
+            for result, data in pool.map(partial(metrics.collect, run_attempt), batch):
+                metrics.merge(data)
+                results.append(result)
+        else:
+            results.extend(pool.map(run_attempt, batch))
+        if target_score is not None and any(r[0] >= target_score for r in results):
+            break
+        if expired(deadline):
+            break
+
+    hits = [i for i, r in enumerate(results) if target_score is not None and r[0] >= target_score]
+    best = hits[0] if hits else max(range(len(results)), key=lambda i: (results[i][0], -i))
+    score, puzzle, placed, locations, status = results[best]
+    if expired(deadline) or any(r[4] == "timeout" for r in results):
+        status = "timeout"
+
+    if VERBOSE:
+        _, _, engine, shuffle = plan[best]
+        tqdm.write(f"[PORTFOLIO] Intento {best + 1}/{len(results)} ({engine}"
+                   f"{', orden mezclado' if shuffle else ''}): puntuación {score:.0f}.")
+    return puzzle, placed, locations, status
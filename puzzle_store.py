@@ -0,0 +1,201 @@
+# puzzle_store.py
+
+import hashlib
+import json
+import os
+import struct
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+from config import PUZZLE_STORE
+
+Location = Tuple[Tuple[int, int], Tuple[int, int]]
+Puzzle = Tuple[List[List[str]], List[str], Dict[str, Location]]
+
+# Cabecera del .bin: firma, versión, semilla del libro (para reanudar con los mismos
+# trabajos) y huella de la configuración que generó los puzzles (sha256)
+MAGIC = b"WSPZ"
+VERSION = 2
+_HEADER = struct.Struct("<4sBQ32s")
+# Cada registro: filas, columnas, nº de ubicaciones, nº de palabras colocadas
+_RECORD = struct.Struct("<HHHH")
+
+
+def run_fingerprint(settings: dict) -> bytes:
+    """Huella (sha256) de la configuración de una ejecución: diccionario, tablero,
+    motores... Un almacén solo se reanuda con la misma huella."""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).digest()
+
+
+def _coord_type(rows: int, cols: int) -> str:
+    """Coordenadas en un byte si caben; en dos si el tablero es mayor de 256."""
+    return 'B' if max(rows, cols) <= 256 else 'H'
+
+
+def _pack_strings(words, out: bytearray) -> None:
+    for w in words:
+        b = w.encode('utf-8')
+        out.append(len(b))
+        out += b
+
+
+def _unpack_strings(data: bytes, pos: int, n: int) -> Tuple[List[str], int]:
+    words = []
+    for _ in range(n):
+        size = data[pos]
+        words.append(data[pos+1:pos+1+size].decode('utf-8'))
+        pos += 1 + size
+    return words, pos
+
+
+def encode_puzzle(puzzle: List[List[str]], placed_words: List[str],
+                  locations: Dict[str, Location]) -> bytes:
+    """Registro binario: el tablero como filas×columnas bytes (latin-1, 0 = vacía),
+    las claves de las ubicaciones, sus coordenadas (r0, c0, rf, cf) como un array
+    de enteros pequeños y las palabras colocadas."""
+    rows, cols = len(puzzle), len(puzzle[0])
+    out = bytearray(_RECORD.pack(rows, cols, len(locations), len(placed_words)))
+    out += ''.join(ch or '\0' for row in puzzle for ch in row).encode('latin-1')
+    _pack_strings(locations, out)
+    coords = array(_coord_type(rows, cols))
+    for (r0, c0), (rf, cf) in locations.values():
+        coords.extend((r0, c0, rf, cf))
+    out += coords.tobytes()
+    _pack_strings(placed_words, out)
+    return bytes(out)
+
+
+def decode_puzzle(data: bytes) -> Puzzle:
+    """Inversa de encode_puzzle."""
+    rows, cols, n_locations, n_placed = _RECORD.unpack_from(data)
+    pos = _RECORD.size
+    grid = data[pos:pos + rows*cols]
+    puzzle = [[chr(v) if v else '' for v in grid[r*cols:(r+1)*cols]] for r in range(rows)]
+    keys, pos = _unpack_strings(data, pos + rows*cols, n_locations)
+    coords = array(_coord_type(rows, cols))
+    end = pos + 4 * n_locations * coords.itemsize
+    coords.frombytes(data[pos:end])
+    locations = {k: ((coords[4*i], coords[4*i+1]), (coords[4*i+2], coords[4*i+3]))
+                 for i, k in enumerate(keys)}
+    placed_words, _ = _unpack_strings(data, end, n_placed)
+    return puzzle, placed_words, locations
+
+
+class PuzzleStore:
+    """
+    Almacén de puzzles en disco, en dos ficheros: `base`.bin con la cabecera y los
+    registros uno tras otro, y `base`.idx con el final de cada registro (uint64),
+    para leer cualquier puzzle sin recorrer los anteriores.
+    Cada puzzle se añade en cuanto está terminado: primero el registro y después
+    su entrada en el índice, así que un corte deja como mucho un registro a medias,
+    que se descarta al reabrir.
+    """
+
+    def __init__(self, base: str = PUZZLE_STORE):
+        self.data_path, self.index_path = f"{base}.bin", f"{base}.idx"
+        self.seed: int | None = None
+        self.fingerprint: bytes | None = None
+        self.discarded: str | None = None  # por qué open() descartó un almacén válido
+        self.ends = array('Q')
+        self._data = self._index = None
+
+    def _read_existing(self) -> bool:
+        """Carga la semilla, la huella y el índice de un almacén existente y válido."""
+        try:
+            with open(self.data_path, 'rb') as f:
+                header = f.read(_HEADER.size)
+                size = os.fstat(f.fileno()).st_size
+            with open(self.index_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return False
+        if len(header) < _HEADER.size:
+            return False
+        magic, version, seed, fingerprint = _HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            return False
+        ends = array('Q')
+        ends.frombytes(raw[:len(raw) - len(raw) % ends.itemsize])
+        while ends and ends[-1] > size:  # entradas de un registro que no llegó a escribirse
+            ends.pop()
+        self.seed, self.fingerprint, self.ends = seed, fingerprint, ends
+        return True
+
+    def open(self, seed: int, fingerprint: bytes, resume: bool = True, keep_seed: bool = True,
+             complete: int | None = None) -> int:
+        """Abre el almacén para añadir puzzles. Con `resume` y un almacén válido de
+        la misma huella (`fingerprint`, ver run_fingerprint), conserva lo guardado;
+        si no, empieza uno nuevo con `seed`. Un almacén con otra semilla se reanuda
+        con la suya si `keep_seed` y, si no, se descarta. Uno que ya tiene
+        `complete` puzzles también se descarta: está terminado, no interrumpido.
+        Devuelve cuántos puzzles hay ya guardados (la semilla queda en self.seed);
+        si se descarta un almacén válido, el motivo queda en self.discarded
+        ("resume", "fingerprint", "seed" o "complete")."""
+        self.discarded = None
+        existing = self._read_existing()
+        if existing:
+            if not resume:
+                self.discarded = "resume"
+            elif self.fingerprint != fingerprint:
+                self.discarded = "fingerprint"
+            elif not keep_seed and self.seed != seed:
+                self.discarded = "seed"
+            elif complete is not None and len(self.ends) >= complete:
+                self.discarded = "complete"
+        if existing and self.discarded is None:
+            end = self.ends[-1] if self.ends else _HEADER.size
+            self._data = open(self.data_path, 'r+b')
+            self._data.truncate(end)
+            self._data.seek(end)
+            self._index = open(self.index_path, 'r+b')
+            self._index.truncate(len(self.ends) * self.ends.itemsize)
+            self._index.seek(0, os.SEEK_END)
+        else:
+            self.seed, self.fingerprint, self.ends = seed, fingerprint, array('Q')
+            self._data = open(self.data_path, 'wb')
+            self._data.write(_HEADER.pack(MAGIC, VERSION, seed, fingerprint))
+            self._data.flush()
+            self._index = open(self.index_path, 'wb')
+        return len(self.ends)
+
+    def load(self) -> bool:
+        """Abre un almacén existente solo para leerlo. False si no hay ninguno válido."""
+        if not self._read_existing():
+            return False
+        self._data = open(self.data_path, 'rb')
+        return True
+
+    def append(self, puzzle: List[List[str]], placed_words: List[str],
+               locations: Dict[str, Location]) -> None:
+        record = encode_puzzle(puzzle, placed_words, locations)
+        self._data.write(record)
+        self._data.flush()
+        self.ends.append(self._data.tell())
+        self._index.write(self.ends[-1:].tobytes())
+        self._index.flush()
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    def __getitem__(self, i: int) -> Puzzle:
+        start = self.ends[i-1] if i > 0 else _HEADER.size
+        self._data.seek(start)
+        data = self._data.read(self.ends[i] - start)
+        if self._index is not None:
+            self._data.seek(0, os.SEEK_END)  # seguir añadiendo al final
+        return decode_puzzle(data)
+
+    def __iter__(self) -> Iterator[Puzzle]:
+        return (self[i] for i in range(len(self)))
+
+    def close(self) -> None:
+        for f in (self._data, self._index):
+            if f is not None:
+                f.close()
+        self._data = self._index = None
+
+    def __enter__(self) -> "PuzzleStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
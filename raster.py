@@ -0,0 +1,175 @@
+# raster.py
+
+import io
+import os
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+from config import (ALPHABET, RASTER_DPI, RASTER_FONT, PDF_PUZZLE_FONT, PDF_SOLUTION_FONT,
+                    PDF_WORDLIST_FONT, SOLUTION_COLS, SOLUTION_SHEET_GAP)
+
+# Medidas de las figuras de matplotlib que sustituye (drawing.py + export_docx.py)
+PUZZLE_INCHES_PER_CELL = 0.5       # figsize=(columnas/2, filas/2)
+SOLUTION_FIGSIZE = (3.0, 2.5)      # figsize de cada miniatura de solución
+BORDER_PT = 1.5                    # grosor de línea por defecto de matplotlib
+SOLUTION_LINE_PT = 2.0             # linewidth=2 de las líneas rojas
+TIGHT_PAD_INCHES = 0.1             # relleno de savefig(bbox_inches='tight')
+LABEL_OFFSET = 0.1                 # ax.text(-0.1, 0.5, ...) en coordenadas de ejes
+
+
+def _px(points: float) -> int:
+    return max(1, round(points * RASTER_DPI / 72))
+
+
+@lru_cache(maxsize=8)
+def _font(size_px: int) -> ImageFont.FreeTypeFont:
+    """La fuente de matplotlib (DejaVu Sans): la del sistema o la que trae matplotlib."""
+    try:
+        return ImageFont.truetype(RASTER_FONT, size_px)
+    except OSError:
+        pass
+    try:
+        import matplotlib
+        path = os.path.join(matplotlib.get_data_path(), "fonts", "ttf", RASTER_FONT)
+        return ImageFont.truetype(path, size_px)
+    except (ImportError, OSError):
+        return ImageFont.load_default(size_px)
+
+
+class GridRenderer:
+    """Dibuja tableros de una forma y tamaño fijos. La plantilla (fondo y borde) y
+    el atlas de letras se rasterizan una sola vez; cada tablero es una copia de la
+    plantilla con una máscara pegada por celda."""
+
+    def __init__(self, rows: int, cols: int, cell: float, font_px: int, pad: int):
+        self.rows, self.cols, self.cell = rows, cols, cell
+        self.font = _font(font_px)
+        self.border = _px(BORDER_PT)
+        self.origin = pad + self.border // 2
+        side = self.origin * 2
+        self.size = (round(cols * cell) + side, round(rows * cell) + side)
+
+        self.template = Image.new("RGB", self.size, "white")
+        x0, y0 = self.origin, self.origin
+        x1, y1 = x0 + round(cols * cell), y0 + round(rows * cell)
+        ImageDraw.Draw(self.template).rectangle((x0, y0, x1, y1), outline="black", width=self.border)
+
+        self.box = 2 * font_px  # máscara holgada: la letra puede ser mayor que la celda
+        self.atlas: dict[str, Image.Image] = {}
+        for ch in ALPHABET:
+            self._glyph(ch)
+
+    def _glyph(self, ch: str) -> Image.Image:
+        mask = self.atlas.get(ch)
+        if mask is None:
+            mask = Image.new("L", (self.box, self.box), 0)
+            ImageDraw.Draw(mask).text((self.box / 2, self.box / 2), ch, fill=255,
+                                      font=self.font, anchor="mm")
+            self.atlas[ch] = mask
+        return mask
+
+    def center(self, r: int, c: int) -> tuple[float, float]:
+        return self.origin + (c + 0.5) * self.cell, self.origin + (r + 0.5) * self.cell
+
+    def _paste(self, image: Image.Image, r: int, c: int, ch: str) -> None:
+        x, y = self.center(r, c)
+        half = self.box // 2
+        image.paste((0, 0, 0), (round(x) - half, round(y) - half), self._glyph(ch))
+
+    def puzzle(self, puzzle: list[list[str]]) -> Image.Image:
+        image = self.template.copy()
+        for r, row in enumerate(puzzle):
+            for c, ch in enumerate(row):
+                if ch:
+                    self._paste(image, r, c, ch)
+        return image
+
+    def solution(self, image: Image.Image, puzzle: list[list[str]],
+                 locations: dict[str, tuple[tuple[int, int], tuple[int, int]]]) -> Image.Image:
+        """Líneas rojas sobre un tablero ya dibujado (se modifica `image`). Como en
+        matplotlib, las letras quedan por encima: se vuelven a pegar las de las palabras."""
+        draw = ImageDraw.Draw(image)
+        width = _px(SOLUTION_LINE_PT)
+        for word, ((r0, c0), (rf, cf)) in locations.items():
+            draw.line((self.center(r0, c0), self.center(rf, cf)), fill=(255, 0, 0), width=width)
+        for word, ((r0, c0), (rf, cf)) in locations.items():
+            dr, dc = (rf > r0) - (rf < r0), (cf > c0) - (cf < c0)
+            for k in range(len(word)):
+                r, c = r0 + dr*k, c0 + dc*k
+                self._paste(image, r, c, puzzle[r][c])
+        return image
+
+
+@lru_cache(maxsize=8)
+def puzzle_renderer(rows: int, cols: int, fontsize: int = PDF_PUZZLE_FONT) -> GridRenderer:
+    return GridRenderer(rows, cols, PUZZLE_INCHES_PER_CELL * RASTER_DPI, _px(fontsize),
+                        round(TIGHT_PAD_INCHES * RASTER_DPI))
+
+
+@lru_cache(maxsize=8)
+def solution_renderer(rows: int, cols: int) -> GridRenderer:
+    w, h = (s * RASTER_DPI for s in SOLUTION_FIGSIZE)
+    return GridRenderer(rows, cols, min(w / cols, h / rows), _px(PDF_SOLUTION_FONT),
+                        round(TIGHT_PAD_INCHES * RASTER_DPI))
+
+
+def _png(image: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def puzzle_png(puzzle: list[list[str]], fontsize: int = PDF_PUZZLE_FONT) -> bytes:
+    """PNG del tablero, con la misma composición que draw_puzzle + savefig."""
+    return _png(puzzle_renderer(len(puzzle), len(puzzle[0]), fontsize).puzzle(puzzle))
+
+
+def solution_image(puzzle: list[list[str]],
+                   locations: dict[str, tuple[tuple[int, int], tuple[int, int]]],
+                   label: str | None = None) -> Image.Image:
+    """Miniatura de la solución, con la etiqueta girada a la izquierda si se da."""
+    renderer = solution_renderer(len(puzzle), len(puzzle[0]))
+    image = renderer.solution(renderer.puzzle(puzzle), puzzle, locations)
+    if not label:
+        return image
+
+    font = _font(_px(PDF_WORDLIST_FONT))
+    left, top, right, bottom = font.getbbox(label, anchor="lt")
+    text = Image.new("L", (right, bottom), 0)
+    ImageDraw.Draw(text).text((0, 0), label, fill=255, font=font, anchor="lt")
+    text = text.rotate(90, expand=True)  # se lee de abajo arriba, como rotation=90
+
+    gap = round(LABEL_OFFSET * SOLUTION_FIGSIZE[0] * RASTER_DPI)
+    pad = round(TIGHT_PAD_INCHES * RASTER_DPI)
+    width = pad + text.width + gap - renderer.origin + image.width
+    out = Image.new("RGB", (width, max(image.height, text.height + 2 * pad)), "white")
+    out.paste(image, (width - image.width, (out.height - image.height) // 2))
+    out.paste((0, 0, 0), (pad, (out.height - text.height) // 2), text)
+    return out
+
+
+def solution_png(puzzle: list[list[str]],
+                 locations: dict[str, tuple[tuple[int, int], tuple[int, int]]],
+                 label: str | None = None) -> bytes:
+    """PNG de la solución, con la misma composición que draw_solution + savefig."""
+    return _png(solution_image(puzzle, locations, label))
+
+
+def solution_sheet_png(group: list[tuple[list[list[str]], dict]], first: int,
+                       cols: int = SOLUTION_COLS) -> bytes:
+    """PNG de una página de soluciones: las miniaturas de `group` (tablero, ubicaciones)
+    en una rejilla de `cols` columnas, centradas en huecos iguales y con las
+    etiquetas "Puzzle N" ya dibujadas. La hoja tiene siempre `cols` huecos de ancho."""
+    tiles = [solution_image(puzzle, locations, f"Puzzle {first + i}")
+             for i, (puzzle, locations) in enumerate(group)]
+    slot_w = max(t.width for t in tiles)
+    slot_h = max(t.height for t in tiles)
+    gap_w, gap_h = round(SOLUTION_SHEET_GAP * slot_w), round(SOLUTION_SHEET_GAP * slot_h)
+    rows = -(-len(tiles) // cols)
+    sheet = Image.new("RGB", (cols*slot_w + (cols-1)*gap_w, rows*slot_h + (rows-1)*gap_h), "white")
+    for i, tile in enumerate(tiles):
+        r, c = divmod(i, cols)
+        sheet.paste(tile, (c*(slot_w + gap_w) + (slot_w - tile.width) // 2,
+                           r*(slot_h + gap_h) + (slot_h - tile.height) // 2))
+    return _png(sheet)
@@ -2,10 +2,15 @@
 
 import random
 from config import DIRECTIONS, ALPHABET
+from geometry import segments, start_bounds
 
+LetterIndex = dict[str, set[tuple[int, int]]]  # letra -> celdas ocupadas con esa letra
 
-def place_word(word: str, puzzle: list[list[str]], r0: int, c0: int, df: int, dc: int) -> tuple[tuple[int,int], tuple[int,int]]:
-    """Place a word in the puzzle and return its start and end coordinates."""
+
+def place_word(word: str, puzzle: list[list[str]], r0: int, c0: int, df: int, dc: int,
+               letter_index: LetterIndex | None = None) -> tuple[tuple[int,int], tuple[int,int]]:
+    """Place a word in the puzzle and return its start and end coordinates.
+    If a letter index is given, it is kept in sync with the placed letters."""
     p = word.upper()
     r, c = r0, c0
     rf = r0 + df*(len(p)-1)
@@ -13,12 +18,16 @@ def place_word(word: str, puzzle: list[list[str]], r0: int, c0: int, df: int, dc
     
     for l in p:
         puzzle[r][c] = l
+        if letter_index is not None:
+            letter_index.setdefault(l, set()).add((r, c))
         r += df; c += dc
         
     return ((r0, c0), (rf, cf))
 
-def remove_word(word: str, puzzle: list[list[str]], r0: int, c0: int, df: int, dc: int) -> None:
-    """Remove a word from the puzzle, preserving crossings with other words."""
+def remove_word(word: str, puzzle: list[list[str]], r0: int, c0: int, df: int, dc: int,
+                letter_index: LetterIndex | None = None) -> None:
+    """Remove a word from the puzzle, preserving crossings with other words.
+    If a letter index is given, cleared cells are dropped from it."""
     p = word.upper()
     r, c = r0, c0
     rows = len(puzzle)
@@ -47,10 +56,58 @@ def remove_word(word: str, puzzle: list[list[str]], r0: int, c0: int, df: int, d
                 break
         
         if not is_crossing:
+            if letter_index is not None:
+                letter_index.get(puzzle[r][c], set()).discard((r, c))
             puzzle[r][c] = ''  # Only clear if not a crossing
         
         r += df; c += dc
 
+def crossing_candidates(
+    word_upper: str, puzzle: list[list[str]], rows: int, columns: int,
+    directions: list[tuple[int, int]], letter_index: LetterIndex
+) -> list[tuple[int, int, int, int, int]]:
+    """Candidates (match_count, r0, c0, df, dc) that cross at least one placed letter.
+    Built from the letter index: each letter of the word is aligned with every cell
+    holding it, in every direction. Ordered as a full scan would list them
+    (direction order, then row, then column)."""
+    L = len(word_upper)
+    segs = segments(rows, columns, L)
+    found: dict[tuple[int, int, int], int] = {}
+    for k, (df, dc) in enumerate(directions):
+        r_lo, r_hi, c_lo, c_hi = start_bounds(rows, columns, L, (df, dc))
+        dir_segs, width = segs[(df, dc)], c_hi - c_lo
+        for i, ch in enumerate(word_upper):
+            for r, c in letter_index.get(ch, ()):
+                r0, c0 = r - df*i, c - dc*i
+                if not (r_lo <= r0 < r_hi and c_lo <= c0 < c_hi) or (k, r0, c0) in found:
+                    continue
+                match_count = 0
+                for (rr, cc), l in zip(dir_segs[(r0 - r_lo)*width + (c0 - c_lo)][2], word_upper):
+                    cur = puzzle[rr][cc]
+                    if cur == l:
+                        match_count += 1
+                    elif cur != '':
+                        match_count = -1
+                        break
+                found[(k, r0, c0)] = match_count
+    return [(m, r0, c0, *directions[k]) for (k, r0, c0), m in sorted(found.items()) if m > 0]
+
+def feasible_placements(
+    word_upper: str, puzzle: list[list[str]], rows: int, columns: int,
+    directions: list[tuple[int, int]]
+) -> list[tuple[int, int, int, int]]:
+    """Every placement (r0, c0, df, dc) where the word fits right now."""
+    segs = segments(rows, columns, len(word_upper))
+    found = []
+    for df, dc in directions:
+        for r0, c0, cells in segs[(df, dc)]:
+            for (r, c), l in zip(cells, word_upper):
+                if puzzle[r][c] not in ('', l):
+                    break
+            else:
+                found.append((r0, c0, df, dc))
+    return found
+
 def fill_empty_spaces(puzzle: list[list[str]], rows: int, columns: int) -> None:
     """Fill empty spaces in the puzzle with random letters."""
     for i in range(rows):